@@ -0,0 +1,68 @@
+"""Measure how much repeated header/nav/footer text strip_boilerplate removes, and how fast.
+
+    python benchmarks/bench_boilerplate.py --pages 9
+    python benchmarks/bench_boilerplate.py --host example.com --db ~/.itpark_scoring/cache.db
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import List
+
+from itpark_scoring.boilerplate import strip_boilerplate
+from itpark_scoring.config import DB_PATH
+from itpark_scoring.storage import CacheStore
+from itpark_scoring.utils import html_to_text
+
+HEADER = (
+    "Home About us Services Cloud migration QA and testing Mobile apps Case studies Careers "
+    "Contact us We use cookies to improve your experience Accept all Cookie settings"
+)
+FOOTER = (
+    "Example Software LLC 12 Amir Temur Street Tashkent Uzbekistan info@example.com "
+    "Privacy policy Terms of use Follow us on LinkedIn Copyright 2024 All rights reserved"
+)
+
+
+def synthetic_texts(count: int, words: int = 600) -> List[str]:
+    rng = random.Random(7)
+    vocabulary = [f"w{i}" for i in range(5000)]
+    return [
+        f"{HEADER} {' '.join(rng.choice(vocabulary) for _ in range(words))} {FOOTER}"
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=9)
+    parser.add_argument("--host", default=None, help="use this company's cached pages")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.host:
+        cache = CacheStore(args.db)
+        urls = cache.urls_for_host(args.host, limit=args.pages)
+        texts = [html_to_text(cache.get_page(url) or "") for url in urls]
+    else:
+        texts = synthetic_texts(args.pages)
+    if not texts:
+        raise SystemExit("No pages to measure")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        _, stats = strip_boilerplate(texts)
+    elapsed = (time.perf_counter() - started) / args.repeat
+
+    print(f"{len(texts)} pages, {stats.chars_before} chars of text")
+    print(
+        f"removed {stats.chars_saved} chars (~{stats.tokens_saved} tokens, "
+        f"{stats.chars_saved / max(stats.chars_before, 1):.1%}) in {elapsed * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
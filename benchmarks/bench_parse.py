@@ -0,0 +1,63 @@
+"""Measure HTML parse/extract throughput of ParsePool from 1 to N worker processes.
+
+    python benchmarks/bench_parse.py --pages 400
+    python benchmarks/bench_parse.py --db ~/.itpark_scoring/cache.db
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from itpark_scoring.parsing import ParsePool
+
+
+def synthetic_pages(count: int) -> List[Tuple[str, str]]:
+    body = "".join(
+        f"<div class='section'><h2>Section {i}</h2><p>We deliver software services, "
+        f"cloud migration and QA for clients in {i % 17} industries.</p>"
+        f"<a href='/services/{i}'>Service {i}</a><script>var x={i};</script></div>"
+        for i in range(300)
+    )
+    return [(f"https://example.com/page{n}", f"<html><body>{body}</body></html>") for n in range(count)]
+
+
+def cached_pages(db_path: Path, limit: int) -> List[Tuple[str, str]]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return list(conn.execute("SELECT url, content FROM pages LIMIT ?", (limit,)))
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--db", type=Path, default=None, help="use pages from a cache.db")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pages = cached_pages(args.db, args.pages) if args.db else synthetic_pages(args.pages)
+    total_mb = sum(len(html) for _, html in pages) / 1e6
+    print(f"{len(pages)} pages, {total_mb:.1f} MB of HTML")
+
+    counts = sorted({2 ** i for i in range(args.max_workers.bit_length())} | {args.max_workers})
+    baseline = None
+    for workers in counts:
+        with ParsePool(workers=workers) as pool:
+            pool.parse(pages[:workers], prime_text=False)  # start worker processes
+            started = time.perf_counter()
+            pool.parse(pages, prime_text=False)
+            elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(
+            f"workers={workers:<3} {elapsed:7.2f}s  {len(pages) / elapsed:8.1f} pages/s  "
+            f"speedup x{baseline / elapsed:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
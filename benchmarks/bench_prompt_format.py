@@ -0,0 +1,52 @@
+"""Compare the verbose and compact scoring wire formats on real cached pages.
+
+Reports prompt/completion tokens and latency per format, averaged over --repeat calls.
+Without an API key only the prompt sizes are compared.
+
+    OPENAI_API_KEY=sk-... python benchmarks/bench_prompt_format.py --host example.com
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+
+from itpark_scoring.config import DB_PATH
+from itpark_scoring.llm import DEFAULT_CRITERIA, DEFAULT_MODEL, LLMUsage, _build_prompt, score_with_llm
+from itpark_scoring.storage import CacheStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--host", required=True, help="company host whose cached pages to use")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cache = CacheStore(args.db)
+    pages = [(url, cache.get_page(url) or "") for url in cache.urls_for_host(args.host, limit=9)]
+    if not pages:
+        raise SystemExit(f"No cached pages for {args.host}")
+
+    for compact in (False, True):
+        system, user = _build_prompt("", DEFAULT_CRITERIA, compact=compact)
+        label = "compact" if compact else "verbose"
+        print(f"{label}: {len(system) + len(user)} prompt chars without page text")
+
+    api_key = os.environ.get("OPENAI_API_KEY", "")
+    if not api_key:
+        return
+    for compact in (False, True):
+        usage = LLMUsage()
+        for _ in range(args.repeat):
+            score_with_llm(pages, api_key, args.model, DEFAULT_CRITERIA, compact=compact, usage=usage)
+        calls = max(usage.calls, 1)
+        print(
+            f"{'compact' if compact else 'verbose':8} prompt={usage.input_tokens / calls:7.0f} "
+            f"completion={usage.output_tokens / calls:6.0f} latency={usage.latency_seconds / calls:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
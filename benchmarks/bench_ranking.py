@@ -0,0 +1,108 @@
+"""Time RankingEngine queries and incremental updates on a synthetic portfolio.
+
+Builds a throwaway cache.db with --companies companies (one finished run each), then
+reports top-k, percentile and leaderboard latency and the cost of one finish_run.
+
+    python benchmarks/bench_ranking.py --companies 50000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from itpark_scoring.aggregate import apply_aggregates
+from itpark_scoring.llm import DEFAULT_CRITERIA
+from itpark_scoring.models import CriterionScore, Scorecard
+from itpark_scoring.ranking import RankingEngine
+from itpark_scoring.storage import CacheStore
+
+
+def random_scorecard(rng: random.Random) -> Scorecard:
+    criteria = [
+        CriterionScore(
+            criterion_id=item["id"],
+            name=item["name"],
+            category=item["category"],
+            score=float(rng.randint(0, 5)),
+            max_score=5.0,
+            weight=1.0,
+            rationale="",
+        )
+        for item in DEFAULT_CRITERIA
+    ]
+    return apply_aggregates(Scorecard(0.0, 0.0, 0.0, {}, criteria, []))
+
+
+def populate(db_path: Path, companies: int, rng: random.Random) -> None:
+    conn = sqlite3.connect(db_path)
+    runs, criteria = [], []
+    for n in range(companies):
+        run_id = uuid.uuid4().hex
+        scorecard = random_scorecard(rng)
+        runs.append((run_id, f"Company {n}", "2024-01-01", "2024-01-01", scorecard.overall_score))
+        criteria.extend(
+            (run_id, c.criterion_id, c.name, c.category, c.score, c.max_score, c.weight, "")
+            for c in scorecard.criteria
+        )
+    conn.executemany(
+        "INSERT INTO runs (id, company_name, started_at, finished_at, overall_score) VALUES (?, ?, ?, ?, ?)",
+        runs,
+    )
+    conn.executemany(
+        "INSERT INTO criteria (run_id, criterion_id, name, category, score, max_score, weight, rationale) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        criteria,
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(label: str, func, repeat: int = 20) -> None:
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    print(f"{label:28} {(time.perf_counter() - started) / repeat * 1000:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=50000)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "cache.db"
+        cache = CacheStore(db_path)
+        populate(db_path, args.companies, rng)
+        started = time.perf_counter()
+        cache.rebuild_rankings()
+        print(f"{args.companies} companies, full rebuild {time.perf_counter() - started:.2f}s")
+
+        engine = RankingEngine(cache)
+        category = engine.categories()[0]
+        probe = f"Company {args.companies // 2}"
+        timed(f"top {args.top} overall", lambda: engine.top_k(args.top))
+        timed(f"top {args.top} {category}", lambda: engine.top_k(args.top, category))
+        timed("company percentile", lambda: engine.company(probe))
+        timed("company profile", lambda: engine.company_profile(probe))
+        timed("all leaderboards", lambda: engine.leaderboards(args.top), repeat=5)
+
+        def new_run() -> None:
+            run_id = uuid.uuid4().hex
+            cache.start_run(run_id, probe, None)
+            scorecard = random_scorecard(rng)
+            cache.save_criteria(run_id, scorecard.criteria)
+            cache.finish_run(run_id, scorecard)
+
+        timed("incremental new run", new_run)
+
+
+if __name__ == "__main__":
+    main()
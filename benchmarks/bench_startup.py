@@ -0,0 +1,83 @@
+"""Track startup cost: core library import time and time to first window.
+
+Import times come from `python -X importtime`; the window timing launches the GUI in a
+child process and stops as soon as the event loop has shown MainWindow.
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+CORE_MODULES = (
+    "itpark_scoring.storage",
+    "itpark_scoring.collector",
+    "itpark_scoring.llm",
+    "itpark_scoring.reports",
+    "itpark_scoring.app",
+)
+
+FIRST_WINDOW = """
+import sys, time
+from PySide6 import QtCore, QtWidgets
+from itpark_scoring.app import MainWindow
+app = QtWidgets.QApplication(sys.argv)
+window = MainWindow()
+window.show()
+def done():
+    print(time.time())
+    app.quit()
+QtCore.QTimer.singleShot(0, done)
+app.exec()
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$")
+
+
+def import_time_ms(module: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1000.0
+    return float("nan")
+
+
+def first_window_ms() -> float:
+    env = dict(os.environ)
+    if not env.get("DISPLAY") and sys.platform.startswith("linux"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    started = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_WINDOW], capture_output=True, text=True, check=True, env=env
+    )
+    return (float(result.stdout.strip().splitlines()[-1]) - started) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-window", action="store_true")
+    args = parser.parse_args()
+
+    for module in CORE_MODULES:
+        samples = [import_time_ms(module) for _ in range(args.repeat)]
+        print(f"import {module:28} {statistics.median(samples):8.1f} ms")
+    if not args.no_window:
+        samples = [first_window_ms() for _ in range(args.repeat)]
+        print(f"time to first window {'':16} {statistics.median(samples):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
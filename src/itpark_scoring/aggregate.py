@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+from .models import CriterionScore, Scorecard
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Confidence credited to a criterion the model scored above zero without any
+# locally found evidence backing it.
+UNSUPPORTED_CONFIDENCE = 0.5
+
+
+def aggregate_arrays(
+    scores: np.ndarray,
+    max_scores: np.ndarray,
+    weights: np.ndarray,
+    category_codes: np.ndarray,
+    n_categories: int,
+    evidence_confidence: np.ndarray,
+) -> Tuple[float, np.ndarray, float, float]:
+    """Weighted aggregates over one scorecard's criteria.
+
+    overall  = 100 * sum(w * s / max) / sum(w)
+    category = the same sum restricted to that category's criteria
+    coverage = share of weight on criteria with evidence or a non-zero score
+    confidence = weighted mean of per-criterion confidence: the best evidence
+    confidence, else UNSUPPORTED_CONFIDENCE for a non-zero score, else 0
+    """
+    import numpy as np
+
+    weights = np.clip(
+        np.nan_to_num(weights.astype(np.float64), nan=0.0, posinf=0.0, neginf=0.0), 0.0, None
+    )
+    scores = np.nan_to_num(scores.astype(np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = np.where(max_scores > 0, scores / max_scores, 0.0)
+    ratio = np.clip(np.nan_to_num(ratio), 0.0, 1.0)
+    total = weights.sum()
+    if total <= 0:
+        return 0.0, np.zeros(n_categories), 0.0, 0.0
+
+    weighted = weights * ratio
+    category_weight = np.bincount(category_codes, weights=weights, minlength=n_categories)
+    category_sum = np.bincount(category_codes, weights=weighted, minlength=n_categories)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        categories = np.where(category_weight > 0, category_sum / category_weight * 100.0, 0.0)
+
+    supported = evidence_confidence > 0
+    covered = supported | (scores > 0)
+    per_criterion = np.where(
+        supported, evidence_confidence, np.where(scores > 0, UNSUPPORTED_CONFIDENCE, 0.0)
+    )
+    overall = float(weighted.sum() / total * 100.0)
+    coverage = float(weights[covered].sum() / total)
+    confidence = float((weights * per_criterion).sum() / total)
+    return overall, categories, coverage, confidence
+
+
+def aggregate_criteria(
+    criteria: Sequence[CriterionScore],
+) -> Tuple[float, Dict[str, float], float, float]:
+    if not criteria:
+        return 0.0, {}, 0.0, 0.0
+    import numpy as np
+
+    names: List[str] = list(dict.fromkeys(item.category for item in criteria))
+    lookup = {name: i for i, name in enumerate(names)}
+    overall, categories, coverage, confidence = aggregate_arrays(
+        scores=np.array([item.score for item in criteria], dtype=np.float64),
+        max_scores=np.array([item.max_score for item in criteria], dtype=np.float64),
+        weights=np.array([item.weight for item in criteria], dtype=np.float64),
+        category_codes=np.array([lookup[item.category] for item in criteria], dtype=np.int64),
+        n_categories=len(names),
+        evidence_confidence=np.array(
+            [max((e.confidence for e in item.evidence), default=0.0) for item in criteria],
+            dtype=np.float64,
+        ),
+    )
+    category_scores = {name: round(float(categories[i]), 2) for i, name in enumerate(names)}
+    return round(overall, 2), category_scores, round(coverage, 3), round(confidence, 3)
+
+
+def apply_aggregates(scorecard: Scorecard) -> Scorecard:
+    overall, category_scores, coverage, confidence = aggregate_criteria(scorecard.criteria)
+    scorecard.overall_score = overall
+    scorecard.category_scores = category_scores
+    scorecard.coverage = coverage
+    scorecard.confidence = confidence
+    return scorecard
@@ -1,25 +1,25 @@
 from __future__ import annotations
 
 import sys
+import threading
 import uuid
 from dataclasses import dataclass
-from pathlib import Path
 from typing import Dict, Optional
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
+from .backends import shared_backend
 from .collector import PublicCollector
-from .llm import DEFAULT_CRITERIA, DEFAULT_MODEL, score_with_llm
+from .config import DB_PATH, OUTPUT_DIR
+from .gate import NO_ENGLISH_FLAG, NO_PUBLIC_INFO_FLAG
+from .llm import DEFAULT_CRITERIA, DEFAULT_MODEL, criteria_version
 from .models import CompanyResult
+from .pipeline import score_pages, store_result
+from .prefetch import CandidatePrefetcher
 from .reports import ReportWriter
 from .storage import CacheStore
 
 
-APP_DIR = Path.home() / ".itpark_scoring"
-DB_PATH = APP_DIR / "cache.db"
-OUTPUT_DIR = APP_DIR / "reports"
-
-
 @dataclass
 class ResolvedCompany:
     name: str
@@ -167,7 +167,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setWindowTitle("IT Park company scoring")
         self.setMinimumSize(980, 680)
 
-        self.cache = CacheStore(DB_PATH)
+        self.cache = CacheStore(DB_PATH, shared=shared_backend())
         self.collector = PublicCollector(self.cache)
         self.reporter = ReportWriter(OUTPUT_DIR)
         self.criteria_by_id = {}
@@ -176,6 +176,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self._build_ui()
         self._apply_style()
         self._update_actions()
+        # Maintenance can run a full VACUUM, so it gets its own thread instead of the event
+        # loop; CacheStore opens a connection per call and SQLite's busy timeout covers
+        # any overlap with a scoring run.
+        threading.Thread(
+            target=self.cache.maybe_maintain, name="cache-maintenance", daemon=True
+        ).start()
 
     def _apply_style(self) -> None:
         self.setStyleSheet(
@@ -371,23 +377,39 @@ class MainWindow(QtWidgets.QMainWindow):
             return
 
         website = candidates[0]
+        prefetch_note = ""
         if len(candidates) > 1:
+            # Fetch every candidate's robots.txt, homepage and top pages while the user decides.
+            prefetcher = CandidatePrefetcher(self.collector)
+            prefetcher.start(candidates)
             chosen, ok = QtWidgets.QInputDialog.getItem(
                 self, "Select company", "Choose the correct website:", candidates, editable=False
             )
+            report = prefetcher.select(chosen if ok else None)
             if not ok:
                 self._set_status("Cancelled.")
                 return
             website = chosen
+            if report.pages:
+                prefetch_note = (
+                    f" ({report.pages} pages prefetched, {report.saved_seconds:.1f}s saved)"
+                )
 
         run_id = uuid.uuid4().hex
-        self.cache.start_run(run_id, name, website)
+        self.cache.start_run(
+            run_id,
+            name,
+            website,
+            model=DEFAULT_MODEL,
+            criteria_version=criteria_version(self._get_selected_criteria()),
+        )
 
-        self._set_status("Collecting public pages...")
+        self._set_status(f"Collecting public pages...{prefetch_note}")
         pages = self.collector.collect_company(website)
         if not pages:
             self._set_status("No public info found or blocked by robots.txt.")
             return
+        self.cache.record_run_pages(run_id, [page.url for page in pages])
 
         api_key = self.api_key_input.text().strip()
         if not api_key:
@@ -404,39 +426,53 @@ class MainWindow(QtWidgets.QMainWindow):
             return
 
         self._set_status("Scoring with AI...")
-        scorecard = score_with_llm(
+        outcome = score_pages(
+            self.cache,
             pages=[(page.url, page.content) for page in pages],
+            website=website,
             api_key=api_key,
             model=DEFAULT_MODEL,
             criteria_list=selected_criteria,
         )
-        if not scorecard:
+        # Gated and disqualified runs are finished too, so they replace the company's rank.
+        store_result(self.cache, run_id, outcome)
+        if outcome.status == "gated":
+            saved = self.cache.get_meta("llm_calls_saved")
+            label = "No public info found" if NO_PUBLIC_INFO_FLAG in outcome.flags else "No English support"
+            self._set_status(
+                f"{label} (disqualified before AI scoring: {outcome.gate.reason}; "
+                f"{saved} AI calls saved)."
+            )
+            return
+
+        if outcome.status == "failed":
             self._set_status("AI scoring failed.")
             return
 
-        if "No public information found." in scorecard.flags:
+        if NO_PUBLIC_INFO_FLAG in outcome.flags:
             self._set_status("No public info found (disqualified).")
             return
 
-        if "No English support." in scorecard.flags:
+        if NO_ENGLISH_FLAG in outcome.flags:
             self._set_status("No English support (disqualified).")
             return
 
+        scorecard = outcome.scorecard
         result = CompanyResult(
             company_name=name,
             website=website,
-            features={},
+            features=outcome.features,
             scorecard=scorecard,
             run_id=run_id,
         )
 
-        self.cache.save_criteria(run_id, scorecard.criteria)
-        self.cache.finish_run(run_id, scorecard)
-
         self._display_result(result)
         self._last_result = result
         self.export_button.setEnabled(True)
-        self._set_status("Done")
+        self._set_status(
+            f"Done ({outcome.local_criteria} criteria scored locally, "
+            f"~{outcome.usage.prompt_tokens_saved} prompt tokens of repeated boilerplate removed)"
+        )
 
     def _display_result(self, result: CompanyResult) -> None:
         self.overall_value.setText(f"{result.scorecard.overall_score:.2f}")
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import quote
+
+from .config import SHARED_CACHE, SHARED_CACHE_TOKEN
+
+if TYPE_CHECKING:
+    import requests
+
+
+class CacheBackend(ABC):
+    # Team-wide store for what is expensive to produce: fetched pages, keyed by
+    # canonical URL, and complete LLM responses, keyed by a hash of model and prompt.
+    # CacheStore reads through it on local misses and writes through on saves.
+    @abstractmethod
+    def get_page(self, key: str) -> Optional[Tuple[str, str]]:
+        ...
+
+    @abstractmethod
+    def put_page(self, key: str, fetched_url: str, content: str, aliases: Iterable[str] = ()) -> None:
+        ...
+
+    @abstractmethod
+    def get_response(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def put_response(self, key: str, model: str, response: str) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteBackend(CacheBackend):
+    # A cache.db-style file that several analysts or the cache server can share. WAL
+    # needs shared memory and breaks on network filesystems, so only the cache server,
+    # which owns its file on local disk, turns it on.
+    def __init__(self, db_path: Path, wal: bool = False):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            if wal:
+                conn.execute("PRAGMA journal_mode = WAL")
+            elif conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal":
+                # journal_mode persists in the file; switching back needs it to be idle,
+                # so a busy file is left alone and retried on the next open.
+                try:
+                    conn.execute("PRAGMA journal_mode = DELETE")
+                except sqlite3.OperationalError:
+                    pass
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    fetched_url TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS page_aliases (
+                    alias TEXT PRIMARY KEY,
+                    url TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get_page(self, key: str) -> Optional[Tuple[str, str]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT fetched_url, content FROM pages
+                WHERE url = COALESCE((SELECT url FROM page_aliases WHERE alias = ?), ?)
+                """,
+                (key, key),
+            ).fetchone()
+        return (row["fetched_url"], row["content"]) if row else None
+
+    def put_page(self, key: str, fetched_url: str, content: str, aliases: Iterable[str] = ()) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO pages (url, fetched_url, content, fetched_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, fetched_url, content, datetime.utcnow().isoformat()),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO page_aliases (alias, url) VALUES (?, ?)",
+                [(alias, key) for alias in aliases if alias != key],
+            )
+
+    def get_response(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        return row["response"] if row else None
+
+    def put_response(self, key: str, model: str, response: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, response, datetime.utcnow().isoformat()),
+            )
+
+
+class HTTPBackend(CacheBackend):
+    # Client for cache_server.py. One pooled requests.Session is shared by every thread;
+    # after a network failure the backend stays quiet for `cooldown` seconds so an
+    # unreachable server costs one timeout, not one per page.
+    def __init__(
+        self,
+        base_url: str,
+        token: Optional[str] = None,
+        timeout: float = 5.0,
+        pool_size: int = 16,
+        cooldown: float = 60.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.cooldown = cooldown
+        self._session: Optional["requests.Session"] = None
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    def _client(self) -> "requests.Session":
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if self.token:
+                    session.headers["Authorization"] = f"Bearer {self.token}"
+                self._session = session
+            return self._session
+
+    def _call(
+        self, method: str, path: str, payload: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        if time.monotonic() < self._down_until:
+            return None
+        import requests
+
+        try:
+            response = self._client().request(
+                method, f"{self.base_url}{path}", json=payload, timeout=self.timeout
+            )
+        except requests.RequestException:
+            self._down_until = time.monotonic() + self.cooldown
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            # A proxy or captive portal answering 200 with HTML is a miss, not a crash.
+            return None
+        return data if isinstance(data, dict) else None
+
+    def get_page(self, key: str) -> Optional[Tuple[str, str]]:
+        data = self._call("GET", f"/pages?key={quote(key, safe='')}")
+        if not data or not isinstance(data.get("content"), str):
+            return None
+        return str(data.get("fetched_url") or key), data["content"]
+
+    def put_page(self, key: str, fetched_url: str, content: str, aliases: Iterable[str] = ()) -> None:
+        self._call(
+            "PUT",
+            "/pages",
+            {"key": key, "fetched_url": fetched_url, "content": content, "aliases": list(aliases)},
+        )
+
+    def get_response(self, key: str) -> Optional[str]:
+        data = self._call("GET", f"/responses/{quote(key, safe='')}")
+        response = data.get("response") if data else None
+        return response if isinstance(response, str) else None
+
+    def put_response(self, key: str, model: str, response: str) -> None:
+        self._call("PUT", f"/responses/{quote(key, safe='')}", {"model": model, "response": response})
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+def open_backend(spec: Optional[str], token: Optional[str] = None) -> Optional[CacheBackend]:
+    if not spec:
+        return None
+    if spec.startswith(("http://", "https://")):
+        return HTTPBackend(spec, token=token)
+    return SQLiteBackend(Path(spec).expanduser())
+
+
+def shared_backend() -> Optional[CacheBackend]:
+    return open_backend(SHARED_CACHE, SHARED_CACHE_TOKEN)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+
+# A run of this many words shared by several pages is treated as template text (nav,
+# cookie banner, footer). Shorter runs are too likely to be ordinary repeated phrases.
+SHINGLE_WORDS = 8
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class BoilerplateStats:
+    chars_before: int = 0
+    chars_after: int = 0
+    shared_shingles: int = 0
+
+    @property
+    def chars_saved(self) -> int:
+        return self.chars_before - self.chars_after
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.chars_saved // CHARS_PER_TOKEN
+
+
+def _shingles(words: List[str], size: int) -> List[int]:
+    return [hash(tuple(words[i : i + size])) for i in range(len(words) - size + 1)]
+
+
+def strip_boilerplate(
+    texts: Sequence[str],
+    shingle_words: int = SHINGLE_WORDS,
+    min_pages: int = 2,
+) -> Tuple[List[str], BoilerplateStats]:
+    stats = BoilerplateStats(chars_before=sum(len(text) for text in texts))
+    pages = [text.split() for text in texts]
+    hashes = [_shingles(words, shingle_words) for words in pages]
+    counts: Counter = Counter()
+    for page_hashes in hashes:
+        counts.update(set(page_hashes))
+    shared = {value for value, count in counts.items() if count >= min_pages}
+    stats.shared_shingles = len(shared)
+
+    # The first page that carries a shared block keeps it; later pages drop every word
+    # covered by a shingle that was already shown. One pass over each page's shingles.
+    shown: set = set()
+    result: List[str] = []
+    for words, page_hashes in zip(pages, hashes):
+        if not shared:
+            result.append(" ".join(words))
+            continue
+        dropped = bytearray(len(words))
+        for index, value in enumerate(page_hashes):
+            if value in shown:
+                dropped[index : index + shingle_words] = b"\x01" * shingle_words
+        shown.update(value for value in page_hashes if value in shared)
+        result.append(" ".join(word for word, drop in zip(words, dropped) if not drop))
+
+    stats.chars_after = sum(len(text) for text in result)
+    return result, stats
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import gzip
+import hmac
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .backends import SQLiteBackend
+
+
+MAX_BODY_BYTES = 20_000_000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    backend: SQLiteBackend
+    token: Optional[str] = None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _authorized(self) -> bool:
+        if not self.token:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        return hmac.compare_digest(supplied, f"Bearer {self.token}")
+
+    def _send(self, status: int, payload: Optional[Any] = None) -> None:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        gzipped = len(body) > 1024 and "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = gzip.compress(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self) -> Tuple[str, str, dict]:
+        parts = urlsplit(self.path)
+        section, _, rest = parts.path.strip("/").partition("/")
+        return section, unquote(rest), parse_qs(parts.query)
+
+    def _json_body(self) -> Optional[dict]:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return None
+        if not 0 < length <= MAX_BODY_BYTES:
+            return None
+        try:
+            data = json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def do_GET(self) -> None:
+        if not self._authorized():
+            return self._send(401)
+        section, key, query = self._route()
+        if section == "health":
+            return self._send(200, {"ok": True})
+        if section == "pages" and query.get("key"):
+            page = self.backend.get_page(query["key"][0])
+            if page is None:
+                return self._send(404)
+            return self._send(200, {"fetched_url": page[0], "content": page[1]})
+        if section == "responses" and key:
+            response = self.backend.get_response(key)
+            if response is None:
+                return self._send(404)
+            return self._send(200, {"response": response})
+        self._send(404)
+
+    def do_PUT(self) -> None:
+        if not self._authorized():
+            return self._send(401)
+        section, key, _ = self._route()
+        data = self._json_body()
+        if data is None:
+            return self._send(400)
+        if section == "pages" and isinstance(data.get("key"), str):
+            self.backend.put_page(
+                data["key"],
+                str(data.get("fetched_url") or data["key"]),
+                str(data.get("content") or ""),
+                [str(alias) for alias in data.get("aliases") or []],
+            )
+            return self._send(200, {"ok": True})
+        if section == "responses" and key and isinstance(data.get("response"), str):
+            self.backend.put_response(key, str(data.get("model") or ""), data["response"])
+            return self._send(200, {"ok": True})
+        self._send(404)
+
+
+def make_server(
+    db_path: Path, host: str = "127.0.0.1", port: int = 8787, token: Optional[str] = None
+) -> ThreadingHTTPServer:
+    handler = type(
+        "CacheHandler", (_Handler,), {"backend": SQLiteBackend(db_path, wal=True), "token": token}
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(
+    db_path: Path, host: str = "127.0.0.1", port: int = 8787, token: Optional[str] = None
+) -> None:
+    server = make_server(db_path, host, port, token)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .config import DB_PATH, EXPORT_DIR, SHARED_CACHE, SHARED_CACHE_DB, SHARED_CACHE_TOKEN
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    from .export import export_results
+
+    paths = export_results(
+        db_path=args.db,
+        output_dir=args.out,
+        fmt=args.format,
+        incremental=args.incremental,
+        name=args.name,
+        chunk_size=args.chunk_size,
+    )
+    if not paths:
+        print("Nothing to export.")
+        return 0
+    for path in paths:
+        print(path)
+    return 0
+
+
+def _cmd_cache_stats(args: argparse.Namespace) -> int:
+    from .backends import open_backend
+    from .storage import CacheStore
+
+    stats = CacheStore(args.db, shared=open_backend(args.shared_cache, args.shared_token)).stats()
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+def _cmd_cache_maintain(args: argparse.Namespace) -> int:
+    from .storage import CacheStore
+
+    cache = CacheStore(
+        args.db,
+        max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None,
+        max_page_age_days=args.max_age_days,
+        eviction_policy=args.policy,
+    )
+    report = cache.maintain(keep_runs_per_company=args.keep_runs)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def _cmd_search(args: argparse.Namespace) -> int:
+    from .evidence import search_corpus
+    from .storage import CacheStore
+
+    for evidence in search_corpus(CacheStore(args.db), args.query, limit=args.limit):
+        print(f"{evidence.confidence:.2f}  {evidence.source_url}\n      {evidence.snippet}")
+    return 0
+
+
+def _selected_criteria(ids: Optional[str]) -> List[dict]:
+    from .llm import DEFAULT_CRITERIA
+
+    if not ids:
+        return list(DEFAULT_CRITERIA)
+    wanted = {item.strip() for item in ids.split(",") if item.strip()}
+    unknown = wanted - {item["id"] for item in DEFAULT_CRITERIA}
+    if unknown:
+        raise SystemExit(f"Unknown criteria: {', '.join(sorted(unknown))}")
+    return [item for item in DEFAULT_CRITERIA if item["id"] in wanted]
+
+
+def _api_key() -> str:
+    api_key = os.environ.get("OPENAI_API_KEY", "")
+    if not api_key:
+        raise SystemExit("Set OPENAI_API_KEY to score with the LLM.")
+    return api_key
+
+
+def _cmd_rescore(args: argparse.Namespace) -> int:
+    from .llm import DEFAULT_MODEL
+    from .rescore import rescore_runs
+    from .storage import CacheStore
+
+    from .backends import open_backend
+
+    summary = rescore_runs(
+        CacheStore(args.db, shared=open_backend(args.shared_cache, args.shared_token)),
+        api_key=_api_key(),
+        model=args.model or DEFAULT_MODEL,
+        criteria_list=_selected_criteria(args.criteria),
+        run_ids=args.run_ids or None,
+        workers=args.workers,
+        progress=lambda company, status: print(f"{status:13} {company}"),
+    )
+    print(
+        f"{summary.total} runs in {summary.seconds:.1f}s: "
+        + ", ".join(f"{status}={count}" for status, count in sorted(summary.statuses.items()))
+    )
+    print(
+        f"LLM calls={summary.usage.calls} prompt tokens={summary.usage.input_tokens} "
+        f"completion tokens={summary.usage.output_tokens} "
+        f"boilerplate tokens removed~{summary.usage.prompt_tokens_saved}"
+    )
+    print(
+        f"truncated responses salvaged={summary.usage.salvaged} "
+        f"follow-up calls for missing criteria={summary.usage.followups} "
+        f"responses reused from cache={summary.usage.cached_responses}"
+    )
+    return 0
+
+
+def _print_ranked(title: str, ranked: list) -> None:
+    print(title)
+    for item in ranked:
+        print(f"  {item.rank:>5}  {item.score:6.2f}  p{item.percentile:5.1f}  {item.company_name}")
+
+
+def _cmd_rank(args: argparse.Namespace) -> int:
+    from .ranking import RankingEngine
+    from .storage import CacheStore
+
+    engine = RankingEngine(CacheStore(args.db))
+    if args.company:
+        profile = engine.company_profile(args.company)
+        if not profile:
+            print(f"{args.company} has no scored run.")
+            return 1
+        _print_ranked(args.company, [])
+        for scope, item in profile.items():
+            print(f"  {scope:20} rank {item.rank:>5}  {item.score:6.2f}  p{item.percentile:5.1f}")
+        return 0
+    if args.leaderboards:
+        for scope, ranked in engine.leaderboards(args.top).items():
+            _print_ranked(scope, ranked)
+        return 0
+    _print_ranked(args.category or "overall", engine.top_k(args.top, args.category))
+    return 0
+
+
+def _cmd_jobs_enqueue(args: argparse.Namespace) -> int:
+    import csv
+
+    from .jobs import JobQueue
+
+    criteria_ids = [item["id"] for item in _selected_criteria(args.criteria)] if args.criteria else None
+    entries = [(name, args.website) for name in args.names]
+    if args.file:
+        with args.file.open(newline="", encoding="utf-8") as handle:
+            for row in csv.reader(handle):
+                if row and row[0].strip():
+                    website = row[1].strip() if len(row) > 1 and row[1].strip() else None
+                    entries.append((row[0].strip(), website))
+    if not entries:
+        raise SystemExit("Give company names or --file.")
+
+    queue = JobQueue(args.db)
+    for name, website in entries:
+        job_id = queue.enqueue(name, website, criteria_ids, max_attempts=args.max_attempts)
+        print(f"{job_id}  {name}")
+    return 0
+
+
+def _cmd_jobs_worker(args: argparse.Namespace) -> int:
+    from .jobs import run_worker
+    from .llm import DEFAULT_MODEL
+
+    worker_args = (args.db, _api_key(), args.model or DEFAULT_MODEL)
+    worker_kwargs = {
+        "lease_seconds": args.lease_seconds,
+        "poll_interval": args.poll_interval,
+        "drain": args.drain,
+        "shared": args.shared_cache,
+        "shared_token": args.shared_token,
+        # Worker processes split the CPUs for HTML parsing between them.
+        "parse_workers": max(1, (os.cpu_count() or 1) // max(1, args.processes)),
+    }
+    if args.processes <= 1:
+        processed = run_worker(*worker_args, **worker_kwargs)
+        print(f"Processed {processed} jobs.")
+        return 0
+
+    import multiprocessing
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=worker_args, kwargs=worker_kwargs)
+        for _ in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return 0
+
+
+def _cmd_cache_serve(args: argparse.Namespace) -> int:
+    from .cache_server import serve
+
+    print(f"Serving {args.path} on http://{args.host}:{args.port}")
+    serve(args.path, host=args.host, port=args.port, token=args.token)
+    return 0
+
+
+def _cmd_jobs_status(args: argparse.Namespace) -> int:
+    from .jobs import JobQueue
+
+    queue = JobQueue(args.db)
+    reclaimed = queue.reclaim_stale()
+    counts = queue.counts()
+    counts["reclaimed"] = reclaimed
+    print(json.dumps(counts, indent=2))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="itpark-scoring-cli")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="path to cache.db")
+    parser.add_argument(
+        "--shared-cache",
+        default=SHARED_CACHE,
+        help="team cache: a cache server URL or a shared SQLite file (ITPARK_SHARED_CACHE)",
+    )
+    parser.add_argument("--shared-token", default=SHARED_CACHE_TOKEN, help=argparse.SUPPRESS)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="export runs with criteria and features")
+    export.add_argument("--format", choices=("csv", "jsonl", "parquet"), default="csv")
+    export.add_argument("--out", type=Path, default=EXPORT_DIR)
+    export.add_argument("--incremental", action="store_true", help="only runs since the last export")
+    export.add_argument("--name", default="default", help="export mark used by --incremental")
+    export.add_argument("--chunk-size", type=int, default=1000)
+    export.set_defaults(func=_cmd_export)
+
+    cache = commands.add_parser("cache", help="inspect or maintain cache.db")
+    cache_commands = cache.add_subparsers(dest="cache_command", required=True)
+    stats = cache_commands.add_parser("stats", help="show size, row counts and hit ratio")
+    stats.set_defaults(func=_cmd_cache_stats)
+    maintain = cache_commands.add_parser("maintain", help="evict pages, prune runs and vacuum")
+    maintain.add_argument("--max-mb", type=float, default=256.0, help="page body budget")
+    maintain.add_argument("--max-age-days", type=int, default=None)
+    maintain.add_argument("--policy", choices=("lru", "age"), default="lru")
+    maintain.add_argument("--keep-runs", type=int, default=None, help="runs kept per company")
+    maintain.set_defaults(func=_cmd_cache_maintain)
+    serve = cache_commands.add_parser("serve", help="run the shared team cache server")
+    serve.add_argument("--path", type=Path, default=SHARED_CACHE_DB, help="shared cache file")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8787)
+    serve.add_argument("--token", default=SHARED_CACHE_TOKEN, help="required bearer token")
+    serve.set_defaults(func=_cmd_cache_serve)
+
+    search = commands.add_parser("search", help="full-text search across cached pages")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    search.set_defaults(func=_cmd_search)
+
+    rescore = commands.add_parser(
+        "rescore", help="re-score stored runs from cached pages without crawling"
+    )
+    rescore.add_argument("--model", default=None, help="defaults to the app's model")
+    rescore.add_argument("--criteria", default=None, help="comma-separated criterion ids")
+    rescore.add_argument("--workers", type=int, default=8, help="concurrent LLM calls")
+    rescore.add_argument("run_ids", nargs="*", help="runs to re-score (default: latest per company)")
+    rescore.set_defaults(func=_cmd_rescore)
+
+    rank = commands.add_parser("rank", help="rank companies by their latest run")
+    rank.add_argument("--top", type=int, default=10)
+    rank.add_argument("--category", default=None, help="rank by one category's score")
+    rank.add_argument("--company", default=None, help="show one company's ranks and percentiles")
+    rank.add_argument("--leaderboards", action="store_true", help="top companies per category")
+    rank.set_defaults(func=_cmd_rank)
+
+    jobs = commands.add_parser("jobs", help="queue companies and run scoring workers")
+    jobs_commands = jobs.add_subparsers(dest="jobs_command", required=True)
+    enqueue = jobs_commands.add_parser("enqueue", help="queue companies for scoring")
+    enqueue.add_argument("names", nargs="*", help="company names")
+    enqueue.add_argument("--website", default=None, help="website for the given names")
+    enqueue.add_argument("--file", type=Path, default=None, help="CSV of name[,website] rows")
+    enqueue.add_argument("--criteria", default=None, help="comma-separated criterion ids")
+    enqueue.add_argument("--max-attempts", type=int, default=3)
+    enqueue.set_defaults(func=_cmd_jobs_enqueue)
+    worker = jobs_commands.add_parser("worker", help="lease and score queued companies")
+    worker.add_argument("--model", default=None, help="defaults to the app's model")
+    worker.add_argument("--processes", type=int, default=1, help="worker processes to start")
+    worker.add_argument("--lease-seconds", type=float, default=300.0)
+    worker.add_argument("--poll-interval", type=float, default=2.0)
+    worker.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+    worker.set_defaults(func=_cmd_jobs_worker)
+    status = jobs_commands.add_parser("status", help="count jobs by state")
+    status.set_defaults(func=_cmd_jobs_status)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,64 @@
 from __future__ import annotations
 
+import gzip
+import heapq
 import re
 import time
-from dataclasses import dataclass
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
 from urllib.parse import parse_qs, urljoin, urlparse
-from urllib.robotparser import RobotFileParser
-
-import requests
-from bs4 import BeautifulSoup
 
+from .parsing import parse_html
+from .ratelimit import THROTTLE_STATUSES, HostRateController, HostState, parse_retry_after
 from .storage import CacheStore
-from .utils import normalize_whitespace, unique_list
+from .urls import canonical_url, clean_url, declared_canonical
+from .utils import remember_text, site_host, unique_list
+
+if TYPE_CHECKING:
+    from urllib.robotparser import RobotFileParser
+
+    import requests
 
 
 USER_AGENT = "Mozilla/5.0 (compatible; ITParkScoringBot/0.1; +https://itpark.local)"
 
+# Relevance of a link keyword for scoring; "contact" is cheap to find elsewhere.
+DISCOVERY_KEYWORDS: Dict[str, float] = {
+    "about": 3.0,
+    "services": 3.0,
+    "solutions": 2.5,
+    "expertise": 2.0,
+    "portfolio": 2.5,
+    "case": 2.5,
+    "clients": 2.0,
+    "industries": 1.5,
+    "contact": 1.0,
+    "careers": 1.5,
+    "jobs": 1.0,
+    "security": 2.0,
+    "privacy": 1.5,
+    "compliance": 2.0,
+    "certification": 2.0,
+}
+# Each level below the homepage halves a link's score; it never reaches zero, so any
+# keyword match still outranks a link with none.
+DEPTH_DECAY = 0.5
+# "en", "de-at", "pt_BR": language prefixes that do not make a page any deeper.
+LOCALE_SEGMENT_RE = re.compile(r"^[a-z]{2}(?:[-_][a-z]{2})?$", re.IGNORECASE)
+MAX_SITEMAP_URLS = 5000
+# Share of CrawlBudget.max_seconds the crawl waits for the sitemap before going on without it.
+SITEMAP_TIME_SHARE = 0.25
+MAX_SITEMAP_FILES = 5
+DEFAULT_MAX_BODY_BYTES = 2_000_000
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([A-Za-z0-9_.:-]+)", re.IGNORECASE)
+SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".mp4", ".mp3",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+)
+
 
 @dataclass
 class Page:
@@ -25,12 +67,174 @@ class Page:
     fetched_at: datetime
 
 
+@dataclass
+class CrawlBudget:
+    max_pages: int = 9
+    max_bytes: int = 3_000_000
+    max_seconds: float = 45.0
+    max_depth: int = 2
+
+
+@dataclass
+class CrawlStats:
+    pages: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    queued: int = 0
+    sitemap_urls: int = 0
+    stopped_by: Optional[str] = None
+
+
+@dataclass
+class FetchStats:
+    fetched: int = 0
+    cache_hits: int = 0
+    failed: int = 0
+    aborted_content_type: int = 0
+    truncated: int = 0
+    bytes_kept: int = 0
+    bytes_skipped: int = 0
+    duplicates: int = 0
+    throttled: int = 0
+    retries: int = 0
+
+
+@dataclass(order=True)
+class _FrontierItem:
+    priority: float
+    seq: int
+    url: str = field(compare=False)
+    depth: int = field(compare=False)
+
+
+class CrawlFrontier:
+    def __init__(self) -> None:
+        self._heap: List[_FrontierItem] = []
+        self._seen: Set[str] = set()
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def mark_seen(self, url: str) -> None:
+        self._seen.add(canonical_url(url))
+
+    def push(self, url: str, score: float, depth: int) -> bool:
+        key = canonical_url(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self._seq += 1
+        heapq.heappush(self._heap, _FrontierItem(-score, self._seq, url, depth))
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        item = heapq.heappop(self._heap)
+        return item.url, item.depth
+
+
+def content_length(value: Optional[str]) -> int:
+    # Only used for skipped-bytes stats, so a malformed header counts as 0. Repeated
+    # headers arrive joined ("123, 123") and are fine when every copy agrees.
+    values = {part.strip() for part in (value or "").split(",")}
+    if len(values) != 1:
+        return 0
+    length = values.pop()
+    return int(length) if length.isascii() and length.isdigit() else 0
+
+
+def _trim_partial_utf8(body: bytes) -> bytes:
+    # A body cut at max_body_bytes can end inside a multi-byte character; drop that
+    # character's leading bytes so the strict UTF-8 decode still succeeds.
+    for back in range(1, min(4, len(body)) + 1):
+        byte = body[-back]
+        if byte & 0xC0 != 0x80:
+            # Lead byte: 110xxxxx starts 2 bytes, 1110xxxx 3, 11110xxx 4.
+            if byte & 0xE0 == 0xC0:
+                needed = 2
+            elif byte & 0xF0 == 0xE0:
+                needed = 3
+            elif byte & 0xF8 == 0xF0:
+                needed = 4
+            else:
+                needed = 1
+            return body[:-back] if needed > back else body
+    return body
+
+
+def decode_body(body: bytes, content_type: str, truncated: bool = False) -> str:
+    match = re.search(r"charset=[\"']?([\w.:-]+)", content_type, re.IGNORECASE)
+    if not match:
+        match = META_CHARSET_RE.search(body[:4096])
+    if match:
+        encoding = match.group(1)
+        if isinstance(encoding, bytes):
+            encoding = encoding.decode("ascii", "ignore")
+        try:
+            return body.decode(encoding, errors="replace")
+        except LookupError:
+            pass
+    try:
+        return (_trim_partial_utf8(body) if truncated else body).decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return body.decode("latin-1")
+    best = from_bytes(body).best()
+    return str(best) if best is not None else body.decode("latin-1")
+
+
+def path_depth(url: str) -> int:
+    parts = [part for part in urlparse(url).path.split("/") if part]
+    return max(1, len([part for part in parts if not LOCALE_SEGMENT_RE.match(part)]))
+
+
+def _by_score(item: Tuple[float, str]) -> Tuple[float, int, str]:
+    # Highest score first; ties go to the shallower page, then to a stable URL order.
+    score, url = item
+    return -score, path_depth(url), url
+
+
+def score_link(href: str, text: str, depth: int) -> float:
+    path = urlparse(href).path.lower()
+    label = text.lower()
+    score = 0.0
+    for keyword, weight in DISCOVERY_KEYWORDS.items():
+        if keyword in path:
+            score += weight
+        elif keyword in label:
+            score += weight * 0.75
+    if score <= 0:
+        return 0.0
+    return score * DEPTH_DECAY ** max(0, depth - 1)
+
+
 class PublicCollector:
-    def __init__(self, cache: CacheStore, timeout: int = 15):
+    def __init__(
+        self,
+        cache: CacheStore,
+        timeout: int = 15,
+        budget: Optional[CrawlBudget] = None,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        rate: Optional[HostRateController] = None,
+        max_retries: int = 1,
+    ):
         self.cache = cache
+        self.rate = rate or HostRateController()
+        self.max_retries = max_retries
         self.timeout = timeout
+        self.budget = budget or CrawlBudget()
+        self.max_body_bytes = max_body_bytes
+        self.last_crawl = CrawlStats()
+        self.fetch_stats = FetchStats()
+        self._robots: Dict[str, "RobotFileParser"] = {}
 
     def search_company(self, name: str, max_results: int = 5) -> List[str]:
+        import requests
+        from bs4 import BeautifulSoup
+
         query = f"{name} company website"
         url = "https://duckduckgo.com/html/"
         params = {"q": query}
@@ -53,13 +257,13 @@ class PublicCollector:
                 if "uddg" in qs:
                     href = qs["uddg"][0]
             candidates.append(href)
-        filtered = []
+        filtered: Dict[str, str] = {}
         for href in candidates:
             parsed = urlparse(href)
             if not parsed.scheme.startswith("http"):
                 continue
-            filtered.append(href)
-        return unique_list(filtered)[:max_results]
+            filtered.setdefault(canonical_url(href), clean_url(href))
+        return list(filtered.values())[:max_results]
 
     def resolve_candidates(self, name: str, provided_website: Optional[str]) -> List[str]:
         if provided_website:
@@ -68,87 +272,351 @@ class PublicCollector:
         return results
 
     def _normalize_url(self, url: str) -> str:
-        parsed = urlparse(url)
-        if not parsed.scheme:
-            return f"https://{url}"
-        return url
+        return clean_url(url)
+
+    def _robots_parser(self, url: str) -> Optional["RobotFileParser"]:
+        from urllib.robotparser import RobotFileParser
+
+        robots_url = urljoin(url, "/robots.txt")
+        parser = self._robots.get(robots_url)
+        if parser is None:
+            parser = RobotFileParser()
+            parser.set_url(robots_url)
+            try:
+                parser.read()
+            except Exception:
+                return None
+            self._robots[robots_url] = parser
+        return parser
 
     def _can_fetch(self, base_url: str, target_url: str) -> bool:
-        robots_url = urljoin(base_url, "/robots.txt")
-        parser = RobotFileParser()
-        parser.set_url(robots_url)
-        try:
-            parser.read()
-        except Exception:
+        parser = self._robots_parser(target_url)
+        if parser is None:
             return True
         return parser.can_fetch(USER_AGENT, target_url)
 
-    def fetch_page(self, url: str) -> Optional[Page]:
-        cached = self.cache.get_page(url)
-        if cached:
-            return Page(url=url, content=cached, fetched_at=datetime.utcnow())
+    def fetch_sitemap_urls(
+        self,
+        base_url: str,
+        max_urls: int = MAX_SITEMAP_URLS,
+        max_files: int = MAX_SITEMAP_FILES,
+        deadline: Optional[float] = None,
+    ) -> List[str]:
+        parser = self._robots_parser(base_url)
+        queue = list((parser.site_maps() if parser else None) or [])
+        queue.append(urljoin(base_url, "/sitemap.xml"))
+        queue = unique_list(queue)
+
+        urls: List[str] = []
+        visited = 0
+        while queue and visited < max_files and len(urls) < max_urls:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            sitemap_url = queue.pop(0)
+            visited += 1
+            nested = self._parse_sitemap(sitemap_url, urls, max_urls)
+            queue.extend(url for url in nested if url not in queue)
+        return urls
+
+    def _parse_sitemap(self, sitemap_url: str, urls: List[str], max_urls: int) -> List[str]:
+        import requests
+
         headers = {"User-Agent": USER_AGENT}
+        nested: List[str] = []
+        self.rate.wait(sitemap_url)
+        started = time.monotonic()
         try:
-            response = requests.get(url, headers=headers, timeout=self.timeout)
-        except requests.RequestException:
+            with requests.get(
+                sitemap_url, headers=headers, timeout=self.timeout, stream=True
+            ) as response:
+                self.rate.record(
+                    sitemap_url,
+                    response.status_code,
+                    time.monotonic() - started,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+                if response.status_code != 200:
+                    return nested
+                response.raw.decode_content = True
+                stream = response.raw
+                if urlparse(sitemap_url).path.endswith(".gz"):
+                    stream = gzip.GzipFile(fileobj=stream)
+                # iterparse keeps memory flat: each entry is handled and dropped as it arrives.
+                in_index_entry = False
+                for event, elem in ET.iterparse(stream, events=("start", "end")):
+                    tag = elem.tag.rsplit("}", 1)[-1]
+                    if tag == "sitemap":
+                        in_index_entry = event == "start"
+                    if event != "end":
+                        continue
+                    if tag == "loc" and elem.text:
+                        (nested if in_index_entry else urls).append(elem.text.strip())
+                    elif tag in ("url", "sitemap"):
+                        elem.clear()
+                    if len(urls) >= max_urls:
+                        break
+        except (requests.RequestException, ET.ParseError, OSError, EOFError):
+            pass
+        return nested
+
+    def rank_sitemap_urls(self, base_url: str, urls: Iterable[str]) -> List[Tuple[float, str]]:
+        host = site_host(base_url)
+        ranked: Dict[str, Tuple[float, str]] = {}
+        for url in urls:
+            parsed = urlparse(url)
+            if not parsed.scheme.startswith("http") or site_host(url) != host:
+                continue
+            if parsed.path.lower().endswith(SKIP_EXTENSIONS):
+                continue
+            score = score_link(url, "", path_depth(url))
+            if score <= 0:
+                continue
+            key = canonical_url(url)
+            if key not in ranked or score > ranked[key][0]:
+                ranked[key] = (score, clean_url(url))
+        return sorted(ranked.values(), key=_by_score)
+
+    def fetch_page(self, url: str) -> Optional[Page]:
+        url = clean_url(url)
+        cached = self.cache.get_page_entry(url)
+        if cached:
+            self.fetch_stats.cache_hits += 1
+            return Page(url=cached[0], content=cached[1], fetched_at=datetime.utcnow())
+        fetched = self._get(url)
+        if fetched is None:
             return None
-        if response.status_code != 200:
+        body, content_type, final_url = fetched
+        content = decode_body(body, content_type, truncated=len(body) >= self.max_body_bytes)
+        self.fetch_stats.fetched += 1
+        # Store under the URL that served the body; the requested URL becomes an alias so
+        # a later lookup through the redirect hits the cache.
+        declared = declared_canonical(content, final_url)
+        if declared and canonical_url(declared) != canonical_url(final_url):
+            # rel=canonical is only trusted as a dedupe hint when the target already holds
+            # this very body; misconfigured sites point every page at the homepage.
+            existing = self.cache.peek_page(declared)
+            if existing is not None and existing[1] == content:
+                self.cache.save_page(existing[0], content, aliases=(url, final_url))
+                return Page(url=existing[0], content=content, fetched_at=datetime.utcnow())
+        self.cache.save_page(final_url, content, aliases=(url,))
+        return Page(url=final_url, content=content, fetched_at=datetime.utcnow())
+
+    def _get(self, url: str) -> Optional[Tuple[bytes, str, str]]:
+        import requests
+
+        headers = {"User-Agent": USER_AGENT}
+        for attempt in range(self.max_retries + 1):
+            # The controller spaces requests per host and holds off after a Retry-After.
+            self.rate.wait(url)
+            started = time.monotonic()
+            try:
+                with requests.get(
+                    url, headers=headers, timeout=self.timeout, stream=True
+                ) as response:
+                    latency = response.elapsed.total_seconds()
+                    status = response.status_code
+                    if status in THROTTLE_STATUSES:
+                        self.fetch_stats.throttled += 1
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        self.rate.record(url, status, latency, retry_after=retry_after)
+                        if attempt < self.max_retries and (
+                            retry_after is None or retry_after <= self.rate.max_retry_after
+                        ):
+                            self.fetch_stats.retries += 1
+                            continue
+                        self.fetch_stats.failed += 1
+                        return None
+                    if status != 200:
+                        self.rate.record(url, status, latency)
+                        self.fetch_stats.failed += 1
+                        return None
+                    body = self._read_body(response)
+                    self.rate.record(url, status, latency, size=len(body or b""))
+                    if body is None:
+                        return None
+                    content_type = response.headers.get("Content-Type", "")
+                    return body, content_type, clean_url(response.url or url)
+            except requests.RequestException:
+                self.rate.record(url, None, time.monotonic() - started)
+                self.fetch_stats.failed += 1
+                return None
+        return None
+
+    def _read_body(self, response: "requests.Response") -> Optional[bytes]:
+        stats = self.fetch_stats
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        declared = content_length(response.headers.get("Content-Length"))
+        if content_type and content_type not in HTML_CONTENT_TYPES:
+            stats.aborted_content_type += 1
+            stats.bytes_skipped += declared
             return None
-        content = response.text
-        self.cache.save_page(url, content)
-        return Page(url=url, content=content, fetched_at=datetime.utcnow())
 
-    def discover_pages(self, base_url: str, homepage_html: str, limit: int = 8) -> List[str]:
-        soup = BeautifulSoup(homepage_html, "lxml")
-        keywords = [
-            "about",
-            "services",
-            "solutions",
-            "expertise",
-            "portfolio",
-            "case",
-            "clients",
-            "industries",
-            "contact",
-            "careers",
-            "jobs",
-            "security",
-            "privacy",
-            "compliance",
-            "certification",
-        ]
-        links = []
-        for a in soup.select("a[href]"):
-            href = a.get("href")
-            text = normalize_whitespace(a.get_text(" "))
-            if not href:
+        chunks: List[bytes] = []
+        kept = 0
+        for chunk in response.iter_content(chunk_size=16384):
+            if not chunk:
+                continue
+            room = self.max_body_bytes - kept
+            if len(chunk) > room:
+                chunks.append(chunk[:room])
+                kept += room
+                stats.truncated += 1
+                # The remainder is never read; count what the server said it would send.
+                stats.bytes_skipped += max(declared - kept, len(chunk) - room)
+                break
+            chunks.append(chunk)
+            kept += len(chunk)
+        stats.bytes_kept += kept
+        return b"".join(chunks)
+
+    def scored_links(self, page_url: str, html: str, depth: int) -> List[Tuple[float, str]]:
+        parsed = parse_html(page_url, html)
+        remember_text(html, parsed.text)
+        host = site_host(page_url)
+        best: Dict[str, Tuple[float, str]] = {}
+        for full, text in parsed.links:
+            url_parts = urlparse(full)
+            if not url_parts.scheme.startswith("http") or site_host(full) != host:
                 continue
-            if href.startswith("#"):
+            if url_parts.path.lower().endswith(SKIP_EXTENSIONS):
                 continue
-            full = urljoin(base_url, href)
-            label = f"{href} {text}".lower()
-            if any(k in label for k in keywords):
-                links.append(full)
-        return unique_list(links)[:limit]
+            score = score_link(full, text, depth)
+            if score <= 0:
+                continue
+            key = canonical_url(full)
+            if key not in best or score > best[key][0]:
+                best[key] = (score, clean_url(full))
+        return sorted(best.values(), key=_by_score)
+
+    def discover_pages(self, base_url: str, homepage_html: str, limit: int = 8) -> List[str]:
+        # scored_links already yields one URL per canonical page.
+        return [url for _, url in self.scored_links(base_url, homepage_html, depth=1)][:limit]
+
+    def collect_company(
+        self,
+        base_url: str,
+        extra_pages: Optional[List[str]] = None,
+        budget: Optional[CrawlBudget] = None,
+    ) -> List[Page]:
+        budget = budget or self.budget
+        stats = CrawlStats()
+        self.last_crawl = stats
+        started = time.monotonic()
 
-    def collect_company(self, base_url: str, extra_pages: Optional[List[str]] = None) -> List[Page]:
         base_url = self._normalize_url(base_url)
         if not self._can_fetch(base_url, base_url):
             return []
+        host = site_host(base_url)
+        if not self.rate.knows(base_url):
+            # Start from the rate this host sustained last time instead of from scratch.
+            learned = self.cache.last_host_rate(host)
+            if learned is not None:
+                self.rate.seed(base_url, learned)
+        rate_before = self.rate.snapshot(base_url)
+        from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
         pages = []
+        # The sitemap does not depend on the homepage, so fetch both at once. It only gets
+        # a share of the crawl's time: a slow sitemap.xml must not starve the page budget.
+        sitemap_deadline = started + budget.max_seconds * SITEMAP_TIME_SHARE
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sitemap")
+        sitemap_future = pool.submit(self.fetch_sitemap_urls, base_url, deadline=sitemap_deadline)
+        pool.shutdown(wait=False)
         homepage = self.fetch_page(base_url)
         if not homepage:
+            sitemap_future.cancel()
             return []
         pages.append(homepage)
-        links = self.discover_pages(base_url, homepage.content)
-        if extra_pages:
-            links.extend(extra_pages)
-        links = unique_list(links)
-        for link in links:
+        stats.bytes += len(homepage.content)
+        try:
+            sitemap_urls: Optional[List[str]] = sitemap_future.result(
+                timeout=max(0.0, sitemap_deadline - time.monotonic())
+            )
+        except TimeoutError:
+            # Still loading: crawl from the homepage links and merge the sitemap if it
+            # arrives while pages are being fetched.
+            sitemap_urls = None
+
+        candidates: Dict[str, Tuple[float, str]] = {}
+        ranked = self.rank_sitemap_urls(base_url, sitemap_urls or [])
+        ranked += self.scored_links(homepage.url, homepage.content, depth=1)
+        for score, link in ranked:
+            key = canonical_url(link)
+            if key not in candidates or score > candidates[key][0]:
+                candidates[key] = (score, link)
+        stats.sitemap_urls = len(sitemap_urls or [])
+
+        frontier = CrawlFrontier()
+        frontier.mark_seen(base_url)
+        frontier.mark_seen(homepage.url)
+        collected = {canonical_url(homepage.url)}
+        for link in extra_pages or []:
+            # Explicitly requested pages go ahead of anything discovered.
+            frontier.push(link, float("inf"), depth=1)
+        for score, link in sorted(candidates.values(), key=_by_score):
+            frontier.push(link, score, depth=1)
+
+        while frontier or sitemap_urls is None:
+            if sitemap_urls is None and (sitemap_future.done() or not frontier):
+                # With nothing else left to fetch, wait for it within the crawl's time.
+                try:
+                    sitemap_urls = sitemap_future.result(
+                        timeout=max(0.0, started + budget.max_seconds - time.monotonic())
+                    )
+                except TimeoutError:
+                    sitemap_urls = []
+                stats.sitemap_urls = len(sitemap_urls)
+                for score, link in self.rank_sitemap_urls(base_url, sitemap_urls):
+                    frontier.push(link, score, depth=1)
+                if not frontier:
+                    break
+            if len(pages) >= budget.max_pages:
+                stats.stopped_by = "pages"
+                break
+            if stats.bytes >= budget.max_bytes:
+                stats.stopped_by = "bytes"
+                break
+            if time.monotonic() - started >= budget.max_seconds:
+                stats.stopped_by = "time"
+                break
+            link, depth = frontier.pop()
             if not self._can_fetch(base_url, link):
                 continue
-            time.sleep(0.5)
             page = self.fetch_page(link)
-            if page:
-                pages.append(page)
+            if not page:
+                continue
+            # Different links can redirect or declare a canonical to the same page.
+            frontier.mark_seen(page.url)
+            if canonical_url(page.url) in collected:
+                self.fetch_stats.duplicates += 1
+                continue
+            collected.add(canonical_url(page.url))
+            pages.append(page)
+            stats.bytes += len(page.content)
+            if depth < budget.max_depth:
+                for score, child in self.scored_links(link, page.content, depth=depth + 1):
+                    frontier.push(child, score, depth=depth + 1)
+
+        stats.pages = len(pages)
+        stats.queued = len(frontier)
+        stats.seconds = time.monotonic() - started
+        self._record_host_history(host, base_url, rate_before, stats.seconds)
         return pages
+
+    def _record_host_history(
+        self, host: str, base_url: str, before: HostState, seconds: float
+    ) -> None:
+        after = self.rate.snapshot(base_url)
+        requests_made = after.requests - before.requests
+        if requests_made <= 0:
+            return
+        self.cache.record_host_stats(
+            host,
+            requests=requests_made,
+            throttled=after.throttled - before.throttled,
+            errors=after.errors - before.errors,
+            size=after.bytes - before.bytes,
+            seconds=seconds,
+            rate=after.rate,
+            latency=after.latency,
+        )
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+APP_DIR = Path.home() / ".itpark_scoring"
+DB_PATH = APP_DIR / "cache.db"
+OUTPUT_DIR = APP_DIR / "reports"
+EXPORT_DIR = APP_DIR / "exports"
+
+# Team cache shared across analysts: an http(s):// cache server URL or a path to a shared
+# SQLite file. Unset means every analyst only uses their own cache.db.
+SHARED_CACHE = os.environ.get("ITPARK_SHARED_CACHE") or None
+SHARED_CACHE_TOKEN = os.environ.get("ITPARK_SHARED_CACHE_TOKEN") or None
+SHARED_CACHE_DB = APP_DIR / "shared_cache.db"
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .aggregate import UNSUPPORTED_CONFIDENCE
+from .models import CriterionScore, Evidence
+from .storage import CacheStore
+from .utils import site_host
+
+
+STOPWORDS = {
+    "or", "and", "of", "the", "a", "an", "to", "in", "for", "on", "signals", "presence",
+    "clarity", "visibility", "options", "signal",
+}
+
+# Extra search terms for criteria whose names are too abstract to match page text well.
+CRITERION_TERMS: Dict[str, List[str]] = {
+    "identity_contact_info": ["contact", "email", "phone"],
+    "identity_legal_identifiers": ["registration", "inc", "llc", "ltd", "vat"],
+    "identity_address_presence": ["address", "office", "street"],
+    "identity_leadership_visibility": ["ceo", "founder", "leadership", "team"],
+    "history_years_in_business": ["founded", "since", "established"],
+    "scale_headcount": ["employees", "engineers", "developers", "team"],
+    "scale_hiring": ["careers", "vacancies", "hiring", "jobs"],
+    "capacity_qa": ["qa", "testing", "quality assurance"],
+    "tech_cloud": ["aws", "azure", "gcp", "cloud"],
+    "tech_devops": ["devops", "ci/cd", "kubernetes", "docker"],
+    "market_engagement_models": ["dedicated team", "time and material", "fixed price"],
+    "market_timezone_fit": ["timezone", "time zone", "nearshore", "offshore"],
+    "reputation_clients_named": ["clients", "partners", "trusted by"],
+    "reputation_reviews_presence": ["clutch", "reviews", "testimonials", "g2"],
+    "compliance_certifications": ["iso 27001", "iso", "soc 2", "certified"],
+    "compliance_ip_protection": ["nda", "intellectual property"],
+    "compliance_data_protection": ["gdpr", "data protection"],
+    "operations_methodology": ["agile", "scrum", "kanban"],
+    "operations_sla": ["sla", "support", "response time"],
+    "finance_rate_range": ["rate", "hourly", "pricing"],
+}
+
+
+def criterion_terms(criterion: CriterionScore) -> List[str]:
+    words = re.findall(r"[a-z0-9]+", criterion.name.lower())
+    terms = [word for word in words if word not in STOPWORDS and len(word) > 2]
+    terms.extend(CRITERION_TERMS.get(criterion.criterion_id, []))
+    return list(dict.fromkeys(terms))
+
+
+def _snippet_confidence(snippet: str, terms: List[str]) -> float:
+    # bm25() magnitudes depend on corpus size, so judge the snippet by the terms it shows.
+    if not terms:
+        return 0.0
+    lowered = snippet.lower()
+    hits = sum(1 for term in terms if term.lower() in lowered)
+    return round(min(1.0, hits / min(len(terms), 3)), 2)
+
+
+def _to_evidence(row, terms: List[str], retrieved_at: datetime) -> Evidence:
+    return Evidence(
+        source_url=row["url"],
+        snippet=row["snippet"],
+        source_type="website",
+        retrieved_at=retrieved_at,
+        confidence=_snippet_confidence(row["snippet"], terms),
+    )
+
+
+def attach_evidence(
+    cache: CacheStore,
+    website: Optional[str],
+    criteria: List[CriterionScore],
+    per_criterion: int = 2,
+) -> int:
+    host = site_host(website) if website else None
+    now = datetime.utcnow()
+    attached = 0
+    for criterion in criteria:
+        # FTS returns snippets because they contain the terms, and weak terms ("team",
+        # "support") match nearly every site. Search hits therefore never cover a criterion
+        # the model scored 0, and never count for more than an unbacked model score.
+        if criterion.evidence or criterion.score <= 0:
+            continue
+        terms = criterion_terms(criterion)
+        rows = cache.search_pages(terms, host=host, limit=per_criterion)
+        criterion.evidence = [_to_evidence(row, terms, now) for row in rows]
+        for item in criterion.evidence:
+            item.confidence = min(item.confidence, UNSUPPORTED_CONFIDENCE)
+        attached += len(criterion.evidence)
+    return attached
+
+
+def search_corpus(cache: CacheStore, query: str, limit: int = 20) -> List[Evidence]:
+    now = datetime.utcnow()
+    terms = query.split()
+    return [_to_evidence(row, terms, now) for row in cache.search_pages(terms, limit=limit)]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from .storage import CacheStore
+
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+EXPORT_KINDS = ("criteria", "features")
+
+# Parquet column types, fixed up front: a chunk whose text column is all NULL (for
+# example evidence_json on runs from before it existed) must not decide the schema.
+_FLOAT_COLUMNS = {
+    "overall_score", "coverage", "confidence", "score", "max_score", "weight",
+    "feature_confidence",
+}
+
+
+class ResultsExporter:
+    def __init__(self, cache: CacheStore, output_dir: Path, chunk_size: int = 1000):
+        self.cache = cache
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+
+    def export(self, fmt: str, incremental: bool = False, name: str = "default") -> List[Path]:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        since = self.cache.get_export_mark(name) if incremental else None
+        window = self.cache.export_window(since)
+        if window is None:
+            return []
+        since, upto = window
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        paths = []
+        for kind in EXPORT_KINDS:
+            path = self.output_dir / f"{kind}_{stamp}.{fmt}"
+            chunks = self.cache.iter_export_rows(kind, since, upto, chunk_size=self.chunk_size)
+            if fmt == "csv":
+                written = self._write_csv(path, chunks)
+            elif fmt == "jsonl":
+                written = self._write_jsonl(path, chunks)
+            else:
+                written = self._write_parquet(path, chunks)
+            if written:
+                paths.append(path)
+
+        if incremental:
+            self.cache.set_export_mark(name, upto)
+        return paths
+
+    def _write_csv(self, path: Path, chunks: Iterable[list]) -> int:
+        count = 0
+        writer = None
+        with path.open("w", newline="", encoding="utf-8") as handle:
+            for rows in chunks:
+                if writer is None:
+                    writer = csv.writer(handle)
+                    writer.writerow(rows[0].keys())
+                writer.writerows(tuple(row) for row in rows)
+                count += len(rows)
+        if not count:
+            path.unlink(missing_ok=True)
+        return count
+
+    def _write_jsonl(self, path: Path, chunks: Iterable[list]) -> int:
+        count = 0
+        with path.open("w", encoding="utf-8") as handle:
+            for rows in chunks:
+                for row in rows:
+                    handle.write(json.dumps(_row_to_record(row), ensure_ascii=False))
+                    handle.write("\n")
+                count += len(rows)
+        if not count:
+            path.unlink(missing_ok=True)
+        return count
+
+    def _write_parquet(self, path: Path, chunks: Iterable[list]) -> int:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError(
+                "Parquet export requires pyarrow: pip install 'itpark-scoring[columnar]'"
+            ) from exc
+
+        count = 0
+        writer = None
+        try:
+            for rows in chunks:
+                columns: Dict[str, list] = {key: [] for key in rows[0].keys()}
+                for row in rows:
+                    for key in columns:
+                        columns[key].append(row[key])
+                if writer is None:
+                    schema = pa.schema(
+                        [
+                            (key, pa.float64() if key in _FLOAT_COLUMNS else pa.string())
+                            for key in columns
+                        ]
+                    )
+                    writer = pq.ParquetWriter(str(path), schema)
+                writer.write_table(pa.Table.from_pydict(columns, schema=writer.schema))
+                count += len(rows)
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+
+def _row_to_record(row) -> Dict[str, object]:
+    record = dict(row)
+    for key in ("flags_json", "value_json", "evidence_json"):
+        if key in record and record[key] is not None:
+            try:
+                record[key[: -len("_json")]] = json.loads(record.pop(key))
+            except json.JSONDecodeError:
+                pass
+    return record
+
+
+def export_results(
+    db_path: Path,
+    output_dir: Path,
+    fmt: str = "csv",
+    incremental: bool = False,
+    name: str = "default",
+    chunk_size: int = 1000,
+) -> List[Path]:
+    cache = CacheStore(db_path)
+    exporter = ResultsExporter(cache, output_dir, chunk_size=chunk_size)
+    return exporter.export(fmt, incremental=incremental, name=name)
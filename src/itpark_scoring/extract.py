@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .models import CriterionScore, Evidence, Feature
+from .utils import html_to_text, unique_list
+
+
+LOCAL_CONFIDENCE_THRESHOLD = 0.8
+
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+MAILTO_RE = re.compile(r"href=[\"']mailto:([^\"'?]+)", re.IGNORECASE)
+TEL_RE = re.compile(r"href=[\"']tel:([^\"']+)", re.IGNORECASE)
+PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{7,18}\d(?![\w/])")
+ADDRESS_RE = re.compile(
+    r"\b\d{1,5}[A-Za-z]?,?\s+(?:[A-Z][\w.'-]*\s+){1,4}"
+    r"(?:Street|St\.|Avenue|Ave\.?|Road|Rd\.|Boulevard|Blvd\.?|Lane|Ln\.|Drive|Dr\.|Way|"
+    r"Square|Sq\.|Place|Pl\.|Highway|Hwy|Parkway|Pkwy|Straße|Strasse|ulitsa|ko'chasi)\b"
+    r"(?:[,\s]+(?:Suite|Ste\.?|Floor|Fl\.?|Office|Unit)\s*#?\w+)?"
+)
+CERTIFICATION_PATTERNS = {
+    "ISO 27001": re.compile(r"\bISO(?:/IEC)?[\s-]*27001\b", re.IGNORECASE),
+    "ISO 9001": re.compile(r"\bISO[\s-]*9001\b", re.IGNORECASE),
+    "SOC 2": re.compile(r"\bSOC[\s-]*(?:2|II)\b(?:\s+Type\s+(?:1|2|I|II))?", re.IGNORECASE),
+    "PCI DSS": re.compile(r"\bPCI[\s-]*DSS\b", re.IGNORECASE),
+    "HIPAA": re.compile(r"\bHIPAA\b"),
+    "CMMI": re.compile(r"\bCMMI(?:\s+(?:Level|ML)\s*\d)?\b", re.IGNORECASE),
+}
+SECURITY_CERTIFICATIONS = {"ISO 27001", "SOC 2", "PCI DSS"}
+FOUNDED_RE = re.compile(
+    r"\b(founded|established|est\.|since|incorporated|started)\s+(?:in\s+)?((?:19|20)\d{2})\b",
+    re.IGNORECASE,
+)
+# "Serving clients since 2019" or "started in 2020" may date a product, office or
+# partnership, so those matches stay below LOCAL_CONFIDENCE_THRESHOLD and the LLM decides.
+WEAK_FOUNDED_VERBS = {"since", "started"}
+PRIVACY_PATH_RE = re.compile(r"privacy|data-protection|gdpr", re.IGNORECASE)
+# Policy-like pages only: "/services/cyber-security" sells security, it is not a policy.
+SECURITY_PATH_RE = re.compile(
+    r"security-(?:policy|statement|overview|practices)|/security/?$|trust-center|/trust\b|"
+    r"responsible-disclosure|vulnerability-disclosure",
+    re.IGNORECASE,
+)
+YEAR_GROUP_RE = re.compile(r"^(?:19|20)\d{2}$")
+
+
+def _snippet(text: str, start: int, end: int, radius: int = 80) -> str:
+    left = max(0, start - radius)
+    right = min(len(text), end + radius)
+    return text[left:right].strip()
+
+
+def _evidence(url: str, snippet: str, confidence: float, now: datetime) -> Evidence:
+    return Evidence(
+        source_url=url,
+        snippet=snippet,
+        source_type="website",
+        retrieved_at=now,
+        confidence=confidence,
+    )
+
+
+def _valid_phone(candidate: str) -> bool:
+    digits = re.sub(r"\D", "", candidate)
+    if not 9 <= len(digits) <= 15:
+        return False
+    # "2019-2020-2021" or "1998 - 2005": runs of years, not a number to dial.
+    groups = re.findall(r"\d+", candidate)
+    if sum(1 for group in groups if YEAR_GROUP_RE.match(group)) >= 2:
+        return False
+    # Bare digit runs without separators are usually ids or dates, not phone numbers.
+    return candidate.strip().startswith("+") or bool(re.search(r"[\s().-]", candidate.strip()))
+
+
+def extract_features(pages: List[Tuple[str, str]]) -> Dict[str, Feature]:
+    now = datetime.utcnow()
+    emails: Dict[str, Evidence] = {}
+    phones: Dict[str, Evidence] = {}
+    addresses: Dict[str, Evidence] = {}
+    certifications: Dict[str, Evidence] = {}
+    years: Dict[int, Evidence] = {}
+    privacy: List[Evidence] = []
+    security: List[Evidence] = []
+
+    for url, html in pages:
+        text = html_to_text(html)
+        path = urlparse(url).path
+
+        for value in MAILTO_RE.findall(html):
+            emails.setdefault(value.strip().lower(), _evidence(url, f"mailto:{value}", 0.95, now))
+        for match in EMAIL_RE.finditer(text):
+            value = match.group(0).lower()
+            if value.endswith((".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp")):
+                continue
+            emails.setdefault(value, _evidence(url, _snippet(text, *match.span()), 0.9, now))
+
+        for value in TEL_RE.findall(html):
+            key = re.sub(r"[^\d+]", "", value)
+            phones.setdefault(key, _evidence(url, f"tel:{value}", 0.95, now))
+        for match in PHONE_RE.finditer(text):
+            if not _valid_phone(match.group(0)):
+                continue
+            key = re.sub(r"[^\d+]", "", match.group(0))
+            # Below LOCAL_CONFIDENCE_THRESHOLD: only tel: links settle contact info locally.
+            phones.setdefault(key, _evidence(url, _snippet(text, *match.span()), 0.7, now))
+
+        for match in ADDRESS_RE.finditer(text):
+            value = match.group(0).strip()
+            addresses.setdefault(value, _evidence(url, _snippet(text, *match.span()), 0.8, now))
+
+        for name, pattern in CERTIFICATION_PATTERNS.items():
+            match = pattern.search(text)
+            if match and name not in certifications:
+                certifications[name] = _evidence(url, _snippet(text, *match.span()), 0.9, now)
+
+        for match in FOUNDED_RE.finditer(text):
+            year = int(match.group(2))
+            if 1900 <= year <= now.year:
+                confidence = 0.6 if match.group(1).lower() in WEAK_FOUNDED_VERBS else 0.85
+                evidence = _evidence(url, _snippet(text, *match.span()), confidence, now)
+                if year not in years or confidence > years[year].confidence:
+                    years[year] = evidence
+
+        if PRIVACY_PATH_RE.search(path) and "privacy" in text.lower():
+            privacy.append(_evidence(url, text[:160], 0.95, now))
+        if SECURITY_PATH_RE.search(path) and "security" in text.lower():
+            security.append(_evidence(url, text[:160], 0.9, now))
+
+    features: Dict[str, Feature] = {}
+
+    def add(name: str, value: object, evidence: List[Evidence]) -> None:
+        if not evidence:
+            return
+        confidence = max(item.confidence for item in evidence)
+        features[name] = Feature(name=name, value=value, confidence=confidence, evidence=evidence)
+
+    add("emails", sorted(emails), list(emails.values()))
+    add("phones", sorted(phones), list(phones.values()))
+    add("addresses", unique_list(addresses), list(addresses.values()))
+    add("certifications", sorted(certifications), list(certifications.values()))
+    if years:
+        # The earliest claim is the founding year; later ones tend to be milestones. An
+        # explicit "founded"/"established" claim wins over an earlier "since".
+        best = max(item.confidence for item in years.values())
+        year = min(value for value, item in years.items() if item.confidence == best)
+        add("founding_year", year, [years[year]])
+    add("privacy_policy_page", privacy[0].source_url if privacy else None, privacy[:1])
+    add("security_policy_page", security[0].source_url if security else None, security[:1])
+    return features
+
+
+def _years_score(founded: int) -> float:
+    age = datetime.utcnow().year - founded
+    if age >= 20:
+        return 5.0
+    if age >= 10:
+        return 4.0
+    if age >= 5:
+        return 3.0
+    if age >= 2:
+        return 2.0
+    return 1.0
+
+
+def _local_rules(features: Dict[str, Feature]) -> Dict[str, Tuple[float, float, str, List[Evidence]]]:
+    rules: Dict[str, Tuple[float, float, str, List[Evidence]]] = {}
+
+    emails = features.get("emails")
+    phones = features.get("phones")
+    if emails and phones:
+        rules["identity_contact_info"] = (
+            5.0,
+            min(emails.confidence, phones.confidence),
+            "Email and phone contacts published on the website.",
+            emails.evidence[:1] + phones.evidence[:1],
+        )
+    elif emails or phones:
+        found = emails or phones
+        kind = "Email" if emails else "Phone"
+        rules["identity_contact_info"] = (
+            4.0,
+            found.confidence,
+            f"{kind} contact published on the website.",
+            found.evidence[:1],
+        )
+
+    addresses = features.get("addresses")
+    if addresses:
+        rules["identity_address_presence"] = (
+            4.5,
+            addresses.confidence,
+            f"Street address published: {addresses.value[0]}.",
+            addresses.evidence[:1],
+        )
+
+    certifications = features.get("certifications")
+    if certifications:
+        names = list(certifications.value)
+        security = [name for name in names if name in SECURITY_CERTIFICATIONS]
+        rules["compliance_certifications"] = (
+            5.0 if security else 4.0,
+            certifications.confidence,
+            f"Certifications mentioned: {', '.join(names)}.",
+            certifications.evidence,
+        )
+
+    privacy = features.get("privacy_policy_page")
+    if privacy:
+        rules["compliance_privacy_policy"] = (
+            5.0,
+            privacy.confidence,
+            f"Privacy policy page available at {privacy.value}.",
+            privacy.evidence,
+        )
+
+    security_page = features.get("security_policy_page")
+    if security_page:
+        rules["compliance_security_policy"] = (
+            4.5,
+            security_page.confidence,
+            f"Security page available at {security_page.value}.",
+            security_page.evidence,
+        )
+
+    founding = features.get("founding_year")
+    if founding:
+        rules["history_years_in_business"] = (
+            _years_score(int(founding.value)),
+            founding.confidence,
+            f"Founded in {founding.value}.",
+            founding.evidence,
+        )
+    return rules
+
+
+def score_locally(
+    features: Dict[str, Feature],
+    criteria_list: List[Dict[str, str]],
+    threshold: float = LOCAL_CONFIDENCE_THRESHOLD,
+) -> Tuple[List[CriterionScore], List[Dict[str, str]]]:
+    rules = _local_rules(features)
+    scored: List[CriterionScore] = []
+    remaining: List[Dict[str, str]] = []
+    for item in criteria_list:
+        rule: Optional[Tuple[float, float, str, List[Evidence]]] = rules.get(item["id"])
+        if rule is None or rule[1] < threshold:
+            remaining.append(item)
+            continue
+        score, _, rationale, evidence = rule
+        scored.append(
+            CriterionScore(
+                criterion_id=item["id"],
+                name=item["name"],
+                category=item["category"],
+                score=score,
+                max_score=5.0,
+                weight=1.0,
+                rationale=rationale,
+                evidence=list(evidence),
+            )
+        )
+    return scored, remaining
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .utils import html_to_text
+
+
+NO_PUBLIC_INFO_FLAG = "No public information found."
+NO_ENGLISH_FLAG = "No English support."
+
+MIN_TEXT_CHARS = 400
+MIN_DISTINCT_WORDS = 60
+MIN_WORDS_FOR_LANGUAGE = 150
+ENGLISH_STOPWORD_RATIO = 0.06
+
+ENGLISH_STOPWORDS = {
+    "the", "and", "of", "to", "in", "for", "with", "on", "is", "are", "we", "our", "you",
+    "your", "that", "this", "by", "from", "as", "at", "it", "be", "or", "an", "us", "have",
+    "has", "can", "will", "more", "about", "all", "their", "which", "what", "how",
+}
+
+PARKED_PATTERNS = re.compile(
+    r"this domain (?:is|may be) for sale|buy this domain|domain (?:is )?parked|parked free"
+    r"|domain parking|hugedomains|sedoparking|dan\.com|afternic|"
+    r"website (?:is )?(?:coming soon|under construction)|future home of",
+    re.IGNORECASE,
+)
+HTML_LANG_RE = re.compile(r"<html[^>]*\slang=[\"']?([A-Za-z-]+)", re.IGNORECASE)
+WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+@dataclass
+class GateResult:
+    flags: List[str] = field(default_factory=list)
+    reason: Optional[str] = None
+    text_chars: int = 0
+    distinct_words: int = 0
+    english_ratio: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return not self.flags
+
+
+def _declared_languages(html: str) -> List[str]:
+    return [match.lower() for match in HTML_LANG_RE.findall(html[:4000])]
+
+
+def _english_ratio(words: List[str]) -> float:
+    if not words:
+        return 0.0
+    return sum(1 for word in words if word in ENGLISH_STOPWORDS) / len(words)
+
+
+def gate_pages(pages: List[Tuple[str, str]]) -> GateResult:
+    texts = [html_to_text(html) for _, html in pages]
+    joined = " ".join(texts)
+    page_words = [[word.lower() for word in WORD_RE.findall(text)] for text in texts]
+    words = [word for page in page_words for word in page]
+    distinct = len(set(words))
+    # A single English page is enough: multilingual sites often translate only a few pages.
+    ratio = max((_english_ratio(page) for page in page_words if len(page) >= 50), default=0.0)
+    result = GateResult(text_chars=len(joined), distinct_words=distinct, english_ratio=ratio)
+
+    if len(joined) < MIN_TEXT_CHARS:
+        result.flags.append(NO_PUBLIC_INFO_FLAG)
+        result.reason = f"only {len(joined)} characters of text"
+        return result
+
+    if PARKED_PATTERNS.search(joined[:5000]) and distinct < MIN_DISTINCT_WORDS * 3:
+        result.flags.append(NO_PUBLIC_INFO_FLAG)
+        result.reason = "parked or placeholder domain"
+        return result
+
+    if distinct < MIN_DISTINCT_WORDS:
+        result.flags.append(NO_PUBLIC_INFO_FLAG)
+        result.reason = f"thin content ({distinct} distinct words)"
+        return result
+
+    declared = [lang for _, html in pages for lang in _declared_languages(html)]
+    declares_english = any(lang.startswith("en") for lang in declared)
+    if (
+        not declares_english
+        and len(words) >= MIN_WORDS_FOR_LANGUAGE
+        and ratio < ENGLISH_STOPWORD_RATIO
+    ):
+        result.flags.append(NO_ENGLISH_FLAG)
+        result.reason = f"no English text detected ({ratio:.1%} English stopwords)"
+    return result
@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .parsing import ParsePool
+from .storage import CacheStore
+from .utils import is_remembered
+
+
+JOB_STATUSES = ("queued", "leased", "done", "failed")
+DEFAULT_LEASE_SECONDS = 300.0
+
+
+@dataclass
+class Job:
+    id: str
+    company_name: str
+    website: Optional[str]
+    criteria_ids: Optional[List[str]]
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode so lease() can hold an explicit BEGIN IMMEDIATE write lock.
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    company_name TEXT NOT NULL,
+                    website TEXT,
+                    criteria_json TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    worker_id TEXT,
+                    lease_expires_at REAL,
+                    heartbeat_at REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    run_id TEXT,
+                    error TEXT
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+                CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires_at);
+                """
+            )
+        finally:
+            conn.close()
+
+    def enqueue(
+        self,
+        company_name: str,
+        website: Optional[str] = None,
+        criteria_ids: Optional[List[str]] = None,
+        max_attempts: int = 3,
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                INSERT INTO jobs (
+                    id, company_name, website, criteria_json, status, max_attempts,
+                    created_at, updated_at
+                ) VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)
+                """,
+                (
+                    job_id,
+                    company_name,
+                    website,
+                    json.dumps(criteria_ids) if criteria_ids is not None else None,
+                    max_attempts,
+                    now,
+                    now,
+                ),
+            )
+        finally:
+            conn.close()
+        return job_id
+
+    def _reclaim(self, conn: sqlite3.Connection, now: float) -> int:
+        expired = conn.execute(
+            """
+            UPDATE jobs
+            SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                error = 'lease expired', worker_id = NULL, lease_expires_at = NULL, updated_at = ?
+            WHERE status = 'leased' AND lease_expires_at < ?
+            """,
+            (now, now),
+        )
+        return expired.rowcount
+
+    def reclaim_stale(self) -> int:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            count = self._reclaim(conn, time.time())
+            conn.execute("COMMIT")
+            return count
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def lease(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Job]:
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers can never
+            # select and lease the same row.
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            self._reclaim(conn, now)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'leased', worker_id = ?, attempts = attempts + 1,
+                    lease_expires_at = ?, heartbeat_at = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (worker_id, now + lease_seconds, now, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return Job(
+            id=row["id"],
+            company_name=row["company_name"],
+            website=row["website"],
+            criteria_ids=json.loads(row["criteria_json"]) if row["criteria_json"] else None,
+            attempts=row["attempts"] + 1,
+            max_attempts=row["max_attempts"],
+        )
+
+    def heartbeat(
+        self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS
+    ) -> bool:
+        now = time.time()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET lease_expires_at = ?, heartbeat_at = ?, updated_at = ?
+                WHERE id = ? AND worker_id = ? AND status = 'leased'
+                """,
+                (now + lease_seconds, now, now, job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def complete(self, job_id: str, worker_id: str, run_id: Optional[str]) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'done', run_id = ?, error = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND worker_id = ? AND status = 'leased'
+                """,
+                (run_id, time.time(), job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = CASE WHEN ? AND attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                    error = ?, worker_id = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND worker_id = ? AND status = 'leased'
+                """,
+                (1 if retry else 0, error, time.time(), job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def counts(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+
+class _Heartbeat:
+    def __init__(self, queue: JobQueue, job: Job, worker_id: str, lease_seconds: float):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(queue, job, worker_id, lease_seconds), daemon=True
+        )
+
+    def _run(self, queue: JobQueue, job: Job, worker_id: str, lease_seconds: float) -> None:
+        while not self._stop.wait(lease_seconds / 3):
+            if not queue.heartbeat(job.id, worker_id, lease_seconds):
+                return
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def process_job(
+    cache: CacheStore,
+    job: Job,
+    api_key: str,
+    model: str,
+    parser: Optional[ParsePool] = None,
+) -> Tuple[Optional[str], Optional[str], bool]:
+    from .collector import PublicCollector
+    from .llm import DEFAULT_CRITERIA, criteria_version
+    from .pipeline import score_pages, store_result
+
+    criteria = DEFAULT_CRITERIA
+    if job.criteria_ids is not None:
+        wanted = set(job.criteria_ids)
+        criteria = [item for item in DEFAULT_CRITERIA if item["id"] in wanted]
+
+    collector = PublicCollector(cache)
+    candidates = collector.resolve_candidates(job.company_name, job.website)
+    if not candidates:
+        return None, "no website found", False
+    # No analyst to disambiguate in batch mode: take the top search hit.
+    website = candidates[0]
+
+    started_at = datetime.utcnow()
+    pages = collector.collect_company(website)
+    if not pages:
+        return None, "no public pages or blocked by robots.txt", False
+    page_pairs = [(page.url, page.content) for page in pages]
+    if parser is not None:
+        # Link discovery already parsed most pages; the rest are parsed off the GIL.
+        parser.parse([pair for pair in page_pairs if not is_remembered(pair[1])])
+
+    result = score_pages(
+        cache,
+        pages=page_pairs,
+        website=website,
+        api_key=api_key,
+        model=model,
+        criteria_list=criteria,
+    )
+    if result.status == "failed":
+        return None, "AI scoring failed", True
+    # The run row is only written once there is a result to finish it with, so failed
+    # attempts and retries leave no unfinished runs behind.
+    run_id = uuid.uuid4().hex
+    cache.start_run(
+        run_id,
+        job.company_name,
+        website,
+        model=model,
+        criteria_version=criteria_version(criteria),
+        started_at=started_at,
+    )
+    cache.record_run_pages(run_id, [page.url for page in pages])
+    store_result(cache, run_id, result)
+    return run_id, None, False
+
+
+def run_worker(
+    db_path: Path,
+    api_key: str,
+    model: str,
+    worker_id: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    poll_interval: float = 2.0,
+    drain: bool = False,
+    stop: Optional[threading.Event] = None,
+    shared: Optional[str] = None,
+    shared_token: Optional[str] = None,
+    parse_workers: Optional[int] = None,
+) -> int:
+    # The shared cache arrives as a spec string so worker processes can open their own.
+    from .backends import open_backend
+
+    worker_id = worker_id or default_worker_id()
+    queue = JobQueue(db_path)
+    cache = CacheStore(db_path, shared=open_backend(shared, shared_token))
+    stop = stop or threading.Event()
+    processed = 0
+    with ParsePool(parse_workers) as parser:
+        while not stop.is_set():
+            job = queue.lease(worker_id, lease_seconds)
+            if job is None:
+                if drain:
+                    break
+                stop.wait(poll_interval)
+                continue
+            with _Heartbeat(queue, job, worker_id, lease_seconds):
+                try:
+                    run_id, error, retry = process_job(cache, job, api_key, model, parser)
+                except Exception as exc:
+                    run_id, error, retry = None, f"{type(exc).__name__}: {exc}", True
+            if error is None:
+                queue.complete(job.id, worker_id, run_id)
+            else:
+                queue.fail(job.id, worker_id, error, retry=retry)
+            processed += 1
+    return processed
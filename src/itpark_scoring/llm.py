@@ -1,16 +1,31 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from typing import Dict, List, Optional, Tuple
-
-from openai import OpenAI
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
+from .aggregate import apply_aggregates
+from .boilerplate import CHARS_PER_TOKEN, strip_boilerplate
 from .models import CriterionScore, Scorecard
+from .salvage import parse_json_object
 from .utils import html_to_text
 
+if TYPE_CHECKING:
+    from .storage import CacheStore
+
 
 DEFAULT_MODEL = "gpt-4.1-mini"
 
+# Send criteria as numbered rows and ask for [index, score, weight, rationale] arrays
+# instead of verbose objects that echo back id, name, category and max_score.
+COMPACT_SCHEMA = True
+# Weight range the prompt asks for; parsed weights are clamped into it.
+MIN_WEIGHT = 0.5
+MAX_WEIGHT = 3.0
+
 DEFAULT_CRITERIA = [
     {"id": "identity_website_quality", "name": "Official website quality", "category": "Identity"},
     {"id": "identity_contact_info", "name": "Contact information presence", "category": "Identity"},
@@ -80,26 +95,53 @@ DEFAULT_CRITERIA = [
 ]
 
 
-def _build_prompt(text: str, criteria_list: List[Dict[str, str]]) -> Tuple[str, str]:
-    criteria = "\n".join(
-        [f"- {item['id']} | {item['category']} | {item['name']}" for item in criteria_list]
+def criteria_version(criteria_list: List[Dict[str, str]]) -> str:
+    payload = json.dumps(
+        sorted((item["id"], item["category"], item["name"]) for item in criteria_list)
     )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def _compact_criteria(criteria_list: List[Dict[str, str]]) -> str:
+    groups: Dict[str, List[str]] = {}
+    for index, item in enumerate(criteria_list):
+        groups.setdefault(item["category"], []).append(f"{index}={item['name']}")
+    return "\n".join(f"{category}: {'; '.join(items)}" for category, items in groups.items())
+
+
+def _build_prompt(
+    text: str, criteria_list: List[Dict[str, str]], compact: bool = False
+) -> Tuple[str, str]:
     system = (
         "You are a strict analyst scoring outsourcing vendors. "
         "Use ONLY the provided text. Do not assume or invent. "
-        "If evidence is missing, score low and reduce coverage/confidence. "
+        "If evidence is missing, score low. "
         "Return ONLY valid JSON."
     )
+    if compact:
+        user = (
+            "Score the company on each numbered criterion below. Use float scores.\n\n"
+            "Criteria (score 0-5 each, 5 is best; weight 0.5-3.0), as Category: index=name:\n"
+            f"{_compact_criteria(criteria_list)}\n\n"
+            "Return JSON in this schema:\n"
+            "{\"c\": [[index, score, weight, \"short rationale\"], ...], \"flags\": [string], "
+            "\"pub\": bool, \"en\": \"y\"|\"n\"|\"u\"}\n"
+            "c has one row per criterion index listed above and no others. "
+            "pub is whether there is enough public information; en is English support.\n\n"
+            "If pub is false, include flag \"No public information found.\"\n\n"
+            f"Text:\n{text}"
+        )
+        return system, user
+
+    criteria = "\n".join(
+        [f"- {item['id']} | {item['category']} | {item['name']}" for item in criteria_list]
+    )
     user = (
         "Score the company using the criteria list below. Use float scores.\n\n"
         "Criteria (score 0-5 each, 5 is best; weight 0.5-3.0):\n"
         f"{criteria}\n\n"
         "Return JSON in this schema:\n"
         "{\n"
-        "  \"overall_score\": float (0-100),\n"
-        "  \"coverage\": float (0-1),\n"
-        "  \"confidence\": float (0-1),\n"
-        "  \"category_scores\": {\"Category\": float (0-100), ...},\n"
         "  \"criteria\": [\n"
         "    {\"id\": string, \"name\": string, \"category\": string, \"score\": float (0-5), "
         "\"max_score\": 5.0, \"weight\": float, \"rationale\": string}\n"
@@ -109,26 +151,208 @@ def _build_prompt(text: str, criteria_list: List[Dict[str, str]]) -> Tuple[str,
         "  \"english_support\": \"yes\"|\"no\"|\"unknown\"\n"
         "}\n\n"
         "Only include criteria that are listed above. Do not add new criteria.\n\n"
-        "If there is not enough public information, set has_public_info=false, "
-        "overall_score=0, coverage=0, confidence=0, and include flag \"No public information found.\"\n\n"
+        "If there is not enough public information, set has_public_info=false "
+        "and include flag \"No public information found.\"\n\n"
         f"Text:\n{text}"
     )
     return system, user
 
 
+def _to_float(value: object, default: float = 0.0) -> float:
+    # json.loads accepts NaN and Infinity; neither may reach the scorecard or the database.
+    if value is None or isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value.strip().replace("%", ""))
+        except ValueError:
+            return default
+    else:
+        return default
+    return number if math.isfinite(number) else default
+
+
+def _criterion_numbers(score: object, max_score: object, weight: object) -> Tuple[float, float, float]:
+    # Clamped to what the prompt asks for, so one wild value cannot skew the aggregates.
+    top = _to_float(max_score, default=5.0)
+    if top <= 0:
+        top = 5.0
+    return (
+        min(max(_to_float(score), 0.0), top),
+        top,
+        min(max(_to_float(weight, default=1.0), MIN_WEIGHT), MAX_WEIGHT),
+    )
+
+
+def _parse_verbose(data: Dict[str, Any]) -> List[CriterionScore]:
+    criteria_list = []
+    for item in data.get("criteria") or []:
+        try:
+            score, max_score, weight = _criterion_numbers(
+                item.get("score", 0.0), item.get("max_score", 5.0), item.get("weight", 1.0)
+            )
+            criteria_list.append(
+                CriterionScore(
+                    criterion_id=item.get("id", "unknown"),
+                    name=item.get("name", ""),
+                    category=item.get("category", ""),
+                    score=score,
+                    max_score=max_score,
+                    weight=weight,
+                    rationale=item.get("rationale", ""),
+                )
+            )
+        except (TypeError, ValueError, AttributeError):
+            continue
+    return criteria_list
+
+
+def _parse_compact(
+    data: Dict[str, Any], criteria_list: List[Dict[str, str]]
+) -> List[CriterionScore]:
+    scored: Dict[int, CriterionScore] = {}
+    for row in data.get("c") or []:
+        if not isinstance(row, list) or not row:
+            continue
+        try:
+            index = int(_to_float(row[0], default=-1))
+            if not 0 <= index < len(criteria_list) or index in scored:
+                continue
+            item = criteria_list[index]
+            score, max_score, weight = _criterion_numbers(
+                row[1] if len(row) > 1 else 0.0, 5.0, row[2] if len(row) > 2 else 1.0
+            )
+            scored[index] = CriterionScore(
+                criterion_id=item["id"],
+                name=item["name"],
+                category=item["category"],
+                score=score,
+                max_score=max_score,
+                weight=weight,
+                rationale=str(row[3]) if len(row) > 3 else "",
+            )
+        except (TypeError, ValueError, OverflowError):
+            continue
+    return [scored[index] for index in sorted(scored)]
+
+
+def _availability(data: Dict[str, Any], compact: bool) -> Tuple[Optional[bool], str]:
+    if compact:
+        english = {"y": "yes", "n": "no"}.get(str(data.get("en", "u")).lower()[:1], "unknown")
+        return data.get("pub"), english
+    return data.get("has_public_info"), str(data.get("english_support", "unknown")).lower()
+
+
+@dataclass
+class LLMUsage:
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_seconds: float = 0.0
+    prompt_chars_saved: int = 0
+    salvaged: int = 0
+    followups: int = 0
+    cached_responses: int = 0
+
+    @property
+    def prompt_tokens_saved(self) -> int:
+        return self.prompt_chars_saved // CHARS_PER_TOKEN
+
+    def merge(self, other: "LLMUsage") -> None:
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.latency_seconds += other.latency_seconds
+        self.prompt_chars_saved += other.prompt_chars_saved
+        self.salvaged += other.salvaged
+        self.followups += other.followups
+        self.cached_responses += other.cached_responses
+
+    def record(self, response: Any, elapsed: float) -> None:
+        self.calls += 1
+        self.latency_seconds += elapsed
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.input_tokens += getattr(usage, "input_tokens", 0) or 0
+            self.output_tokens += getattr(usage, "output_tokens", 0) or 0
+
+
+def response_key(model: str, system: str, user: str) -> str:
+    return hashlib.sha1(f"{model}\0{system}\0{user}".encode("utf-8")).hexdigest()
+
+
+def _request_scores(
+    client: Any,
+    model: str,
+    system: str,
+    user: str,
+    prompt_criteria: List[Dict[str, str]],
+    compact: bool,
+    usage: Optional[LLMUsage],
+    responses: Optional["CacheStore"] = None,
+) -> Optional[Tuple[Dict[str, Any], List[CriterionScore]]]:
+    # temperature=0 on an identical prompt gives the same answer, so a complete response
+    # saved by anyone sharing the cache is reused instead of paid for again.
+    key = response_key(model, system, user)
+    cached = responses.get_response(key) if responses is not None else None
+    data, complete = parse_json_object(cached) if cached else (None, False)
+    if data is not None and complete:
+        if usage is not None:
+            usage.cached_responses += 1
+    else:
+        started = time.monotonic()
+        try:
+            response = client.responses.create(
+                model=model,
+                input=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user},
+                ],
+                temperature=0,
+            )
+        except Exception:
+            return None
+        if usage is not None:
+            usage.record(response, time.monotonic() - started)
+
+        raw = response.output_text or ""
+        data, complete = parse_json_object(raw)
+        if data is None:
+            return None
+        if complete and responses is not None:
+            responses.save_response(key, model, raw)
+        if not complete and usage is not None:
+            usage.salvaged += 1
+    if compact:
+        return data, _parse_compact(data, prompt_criteria)
+    return data, _parse_verbose(data)
+
+
 def score_with_llm(
     pages: List[Tuple[str, str]],
     api_key: str,
     model: str,
     criteria_list: Optional[List[Dict[str, str]]] = None,
+    local_scores: Optional[List[CriterionScore]] = None,
+    compact: bool = COMPACT_SCHEMA,
+    usage: Optional[LLMUsage] = None,
+    responses: Optional["CacheStore"] = None,
 ) -> Optional[Scorecard]:
     if not api_key:
         return None
 
+    from openai import OpenAI
+
     client = OpenAI(api_key=api_key)
+    # Drop header/nav/footer text repeated across pages before the per-page cut, so the
+    # budget goes to each page's own content.
+    texts, boilerplate = strip_boilerplate([html_to_text(html) for _, html in pages])
+    if usage is not None:
+        usage.prompt_chars_saved += boilerplate.chars_saved
     chunks: List[str] = []
-    for url, html in pages:
-        text = html_to_text(html)
+    for (url, _), text in zip(pages, texts):
         text = text[:4000]
         chunks.append(f"URL: {url}\n{text}")
     joined = "\n\n".join(chunks)
@@ -139,59 +363,49 @@ def score_with_llm(
     if not criteria_list:
         return None
 
-    system, user = _build_prompt(joined, criteria_list)
-
-    try:
-        response = client.responses.create(
-            model=model,
-            input=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            temperature=0,
-        )
-    except Exception:
-        return None
-
-    raw = response.output_text or "{}"
-    try:
-        data = json.loads(raw)
-    except json.JSONDecodeError:
+    local_scores = list(local_scores or [])
+    local_ids = {item.criterion_id for item in local_scores}
+    prompt_criteria = [item for item in criteria_list if item["id"] not in local_ids]
+    if not prompt_criteria:
+        # The disqualification checks still need the model, so let it see every criterion.
+        prompt_criteria = criteria_list
+        local_scores = []
+
+    system, user = _build_prompt(joined, prompt_criteria, compact=compact)
+    parsed = _request_scores(
+        client, model, system, user, prompt_criteria, compact, usage, responses
+    )
+    if parsed is None:
         return None
-
-    def to_float(value: object, default: float = 0.0) -> float:
-        if value is None:
-            return default
-        if isinstance(value, (int, float)):
-            return float(value)
-        if isinstance(value, str):
-            cleaned = value.strip().replace("%", "")
-            try:
-                return float(cleaned)
-            except ValueError:
-                return default
-        return default
-
-    criteria_list = []
-    for item in data.get("criteria", []):
-        try:
-            criteria_list.append(
-                CriterionScore(
-                    criterion_id=item.get("id", "unknown"),
-                    name=item.get("name", ""),
-                    category=item.get("category", ""),
-                    score=to_float(item.get("score", 0.0)),
-                    max_score=to_float(item.get("max_score", 5.0), default=5.0),
-                    weight=to_float(item.get("weight", 1.0), default=1.0),
-                    rationale=item.get("rationale", ""),
-                )
-            )
-        except (TypeError, ValueError):
-            continue
+    data, criteria_list = parsed
+
+    # Truncated or incomplete answers keep what they scored; only the missing criteria
+    # are asked for again instead of re-running the whole company.
+    scored_ids = {item.criterion_id for item in criteria_list}
+    missing = [item for item in prompt_criteria if item["id"] not in scored_ids]
+    no_public_info = (
+        _availability(data, compact)[0] is False
+        or "No public information found." in (data.get("flags") or [])
+    )
+    if missing and not no_public_info:
+        if usage is not None:
+            usage.followups += 1
+        system, user = _build_prompt(joined, missing, compact=compact)
+        followup = _request_scores(
+            client, model, system, user, missing, compact, usage, responses
+        )
+        if followup is not None:
+            extra, extra_criteria = followup
+            criteria_list += [item for item in extra_criteria if item.criterion_id not in scored_ids]
+            for key, value in extra.items():
+                if key == "flags":
+                    merged = list(data.get("flags") or []) + list(value or [])
+                    data["flags"] = list(dict.fromkeys(merged))
+                else:
+                    data.setdefault(key, value)
 
     flags = list(data.get("flags") or [])
-    has_public_info = data.get("has_public_info")
-    english_support = str(data.get("english_support", "unknown")).lower()
+    has_public_info, english_support = _availability(data, compact)
 
     if has_public_info is False and "No public information found." not in flags:
         flags.append("No public information found.")
@@ -199,25 +413,20 @@ def score_with_llm(
     if english_support == "no" and "No English support." not in flags:
         flags.append("No English support.")
 
-    overall_score = to_float(data.get("overall_score", 0.0))
-    coverage = to_float(data.get("coverage", 0.0))
-    confidence = to_float(data.get("confidence", 0.0))
-    category_scores = {
-        key: to_float(value) for key, value in (data.get("category_scores") or {}).items()
-    }
+    criteria_list = local_scores + criteria_list
 
     if has_public_info is False:
-        overall_score = 0.0
-        coverage = 0.0
-        confidence = 0.0
-        category_scores = {}
         criteria_list = []
 
-    return Scorecard(
-        overall_score=overall_score,
-        coverage=coverage,
-        confidence=confidence,
-        category_scores=category_scores,
-        criteria=criteria_list,
-        flags=flags,
+    # Aggregates are computed locally rather than generated, so they always agree with
+    # the criteria and cost no output tokens.
+    return apply_aggregates(
+        Scorecard(
+            overall_score=0.0,
+            coverage=0.0,
+            confidence=0.0,
+            category_scores={},
+            criteria=criteria_list,
+            flags=flags,
+        )
     )
@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Evidence:
     source_url: str
     snippet: str
@@ -14,7 +14,7 @@ class Evidence:
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Feature:
     name: str
     value: Any
@@ -22,7 +22,7 @@ class Feature:
     evidence: List[Evidence] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class CriterionScore:
     criterion_id: str
     name: str
@@ -31,9 +31,10 @@ class CriterionScore:
     max_score: float
     weight: float
     rationale: str
+    evidence: List[Evidence] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Scorecard:
     overall_score: float
     coverage: float
@@ -43,7 +44,7 @@ class Scorecard:
     flags: List[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class CompanyResult:
     company_name: str
     website: Optional[str]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+from .utils import normalize_whitespace, remember_text, soup_to_text
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+# Pages are shipped to workers in batches of roughly this many characters so the
+# per-task pickling and IPC overhead is amortised over several documents.
+BATCH_CHARS = 1_000_000
+
+
+@dataclass
+class ParsedPage:
+    url: str
+    text: str
+    links: List[Tuple[str, str]] = field(default_factory=list)
+
+
+def parse_html(url: str, html: str) -> ParsedPage:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    links = []
+    for a in soup.select("a[href]"):
+        href = a.get("href")
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        links.append((urljoin(url, href).split("#")[0], normalize_whitespace(a.get_text(" "))))
+    return ParsedPage(url=url, text=soup_to_text(soup), links=links)
+
+
+def _parse_batch(batch: List[Tuple[str, str]]) -> List[ParsedPage]:
+    return [parse_html(url, html) for url, html in batch]
+
+
+def _batches(pages: Sequence[Tuple[str, str]], batch_chars: int) -> Iterator[List[Tuple[str, str]]]:
+    batch: List[Tuple[str, str]] = []
+    size = 0
+    for url, html in pages:
+        batch.append((url, html))
+        size += len(html)
+        if size >= batch_chars:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+class ParsePool:
+    def __init__(self, workers: Optional[int] = None, batch_chars: int = BATCH_CHARS):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_chars = batch_chars
+        self._executor: Optional["ProcessPoolExecutor"] = None
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def parse(self, pages: Sequence[Tuple[str, str]], prime_text: bool = True) -> List[ParsedPage]:
+        if self.workers <= 1:
+            results = _parse_batch(list(pages))
+        else:
+            if self._executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            results = []
+            for parsed in self._executor.map(_parse_batch, _batches(pages, self.batch_chars)):
+                results.extend(parsed)
+        if prime_text:
+            # Later html_to_text() calls on these pages (gate, extraction, prompt) become lookups.
+            for (_, html), parsed in zip(pages, results):
+                remember_text(html, parsed.text)
+        return results
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .aggregate import apply_aggregates
+from .evidence import attach_evidence
+from .extract import extract_features, score_locally
+from .gate import NO_ENGLISH_FLAG, NO_PUBLIC_INFO_FLAG, GateResult, gate_pages
+from .llm import LLMUsage, score_with_llm
+from .models import Feature, Scorecard
+from .storage import CacheStore
+
+
+@dataclass
+class PipelineResult:
+    # "scored", "gated" (stopped before the LLM), "disqualified" (flagged by the LLM)
+    # or "failed" (no usable LLM response).
+    status: str
+    scorecard: Optional[Scorecard] = None
+    features: Dict[str, Feature] = field(default_factory=dict)
+    gate: Optional[GateResult] = None
+    local_criteria: int = 0
+    usage: LLMUsage = field(default_factory=LLMUsage)
+
+    @property
+    def flags(self) -> List[str]:
+        if self.scorecard is not None:
+            return list(self.scorecard.flags)
+        if self.gate is not None:
+            return list(self.gate.flags)
+        return []
+
+
+def empty_scorecard(flags: List[str]) -> Scorecard:
+    return Scorecard(
+        overall_score=0.0,
+        coverage=0.0,
+        confidence=0.0,
+        category_scores={},
+        criteria=[],
+        flags=list(flags),
+    )
+
+
+def score_pages(
+    cache: CacheStore,
+    pages: List[Tuple[str, str]],
+    website: Optional[str],
+    api_key: str,
+    model: str,
+    criteria_list: List[Dict[str, str]],
+    usage: Optional[LLMUsage] = None,
+) -> PipelineResult:
+    gate = gate_pages(pages)
+    if not gate.passed:
+        cache.increment_meta("llm_calls_saved")
+        return PipelineResult(status="gated", gate=gate)
+
+    features = extract_features(pages)
+    local_scores, _ = score_locally(features, criteria_list)
+    run_usage = LLMUsage()
+    scorecard = score_with_llm(
+        pages=pages,
+        api_key=api_key,
+        model=model,
+        criteria_list=criteria_list,
+        local_scores=local_scores,
+        usage=run_usage,
+        responses=cache,
+    )
+    if usage is not None:
+        usage.merge(run_usage)
+    if run_usage.prompt_chars_saved:
+        cache.increment_meta("prompt_chars_saved", run_usage.prompt_chars_saved)
+    result = PipelineResult(
+        status="failed",
+        features=features,
+        gate=gate,
+        local_criteria=len(local_scores),
+        usage=run_usage,
+    )
+    if not scorecard:
+        return result
+    result.scorecard = scorecard
+    if NO_PUBLIC_INFO_FLAG in scorecard.flags or NO_ENGLISH_FLAG in scorecard.flags:
+        result.status = "disqualified"
+        return result
+
+    # Gate, extraction and the prompt have parsed these pages by now, so indexing them
+    # is a memo lookup rather than another parse.
+    cache.index_pages(pages)
+    attach_evidence(cache, website, scorecard.criteria)
+    apply_aggregates(scorecard)
+    result.status = "scored"
+    return result
+
+
+def store_result(cache: CacheStore, run_id: str, result: PipelineResult) -> None:
+    if result.status == "failed":
+        return
+    cache.save_features(run_id, result.features)
+    if result.status == "scored" and result.scorecard is not None:
+        cache.save_criteria(run_id, result.scorecard.criteria)
+        cache.finish_run(run_id, result.scorecard)
+    else:
+        cache.finish_run(run_id, empty_scorecard(result.flags))
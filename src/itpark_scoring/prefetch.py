@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .collector import Page, PublicCollector
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+
+PREFETCH_TOP_PAGES = 3
+
+
+@dataclass
+class _CandidateTask:
+    url: str
+    cancel: threading.Event = field(default_factory=threading.Event)
+    fetches: List[Tuple[float, float]] = field(default_factory=list)
+    pages: int = 0
+    future: Optional["Future"] = None
+
+
+@dataclass
+class PrefetchReport:
+    chosen: Optional[str]
+    pages: int = 0
+    # Network time for the chosen site that finished while the user was still deciding.
+    saved_seconds: float = 0.0
+    cancelled: int = 0
+
+
+class CandidatePrefetcher:
+    # Warms the page cache for every candidate website while the user picks one, so
+    # collect_company on the chosen site starts from cache hits.
+    def __init__(self, collector: PublicCollector, top_pages: int = PREFETCH_TOP_PAGES):
+        self.collector = collector
+        self.top_pages = top_pages
+        self._tasks: Dict[str, _CandidateTask] = {}
+        self._executor: Optional["ThreadPoolExecutor"] = None
+
+    def start(self, candidates: List[str]) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(candidates)), thread_name_prefix="prefetch"
+        )
+        for url in candidates:
+            task = _CandidateTask(url=url)
+            task.future = self._executor.submit(self._prefetch, task)
+            self._tasks[url] = task
+
+    def _timed_fetch(self, task: _CandidateTask, url: str) -> Optional[Page]:
+        started = time.monotonic()
+        page = self.collector.fetch_page(url)
+        task.fetches.append((started, time.monotonic()))
+        if page is not None:
+            task.pages += 1
+        return page
+
+    def _prefetch(self, task: _CandidateTask) -> None:
+        collector = self.collector
+        base_url = collector._normalize_url(task.url)
+        # Robots is read (and cached on the collector) before anything else is fetched.
+        if task.cancel.is_set() or not collector._can_fetch(base_url, base_url):
+            return
+        homepage = self._timed_fetch(task, base_url)
+        if homepage is None:
+            return
+        for link in collector.discover_pages(homepage.url, homepage.content, limit=self.top_pages):
+            if task.cancel.is_set():
+                return
+            if collector._can_fetch(base_url, link):
+                self._timed_fetch(task, link)
+
+    def select(self, chosen: Optional[str]) -> PrefetchReport:
+        selected_at = time.monotonic()
+        report = PrefetchReport(chosen=chosen)
+        for url, task in self._tasks.items():
+            if url == chosen:
+                continue
+            task.cancel.set()
+            if task.future is not None and (task.future.cancel() or not task.future.done()):
+                report.cancelled += 1
+
+        task = self._tasks.get(chosen) if chosen else None
+        if task is not None and task.future is not None:
+            # Its remaining fetches are the ones collect_company would make next anyway;
+            # letting them finish avoids requesting the same page twice.
+            try:
+                task.future.result()
+            except Exception:
+                pass
+            report.pages = task.pages
+            report.saved_seconds = sum(
+                max(0.0, min(end, selected_at) - start) for start, end in task.fetches
+            )
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        return report
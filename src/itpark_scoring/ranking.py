@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .storage import OVERALL_SCOPE, CacheStore
+
+
+@dataclass
+class RankedCompany:
+    company_name: str
+    run_id: str
+    score: float
+    rank: int
+    # Share of ranked companies scoring below, counting ties as half.
+    percentile: float
+
+
+class RankingEngine:
+    # Reads the latest_runs/latest_scores tables that CacheStore.finish_run keeps current,
+    # so queries never rescan the run history.
+    def __init__(self, cache: CacheStore):
+        self.cache = cache
+
+    def categories(self) -> List[str]:
+        return [scope for scope in self.cache.ranking_scopes() if scope != OVERALL_SCOPE]
+
+    def _ranked(self, row: sqlite3.Row, total: int) -> RankedCompany:
+        below = total - row["rank"] + 1 - row["ties"]
+        return RankedCompany(
+            company_name=row["company_name"],
+            run_id=row["run_id"],
+            score=row["score"],
+            rank=row["rank"],
+            percentile=(below + 0.5 * row["ties"]) / total * 100.0,
+        )
+
+    def top_k(self, k: int = 10, category: Optional[str] = None) -> List[RankedCompany]:
+        scope = category or OVERALL_SCOPE
+        total = self.cache.ranked_count(scope)
+        return [self._ranked(row, total) for row in self.cache.rank_top(k, scope)]
+
+    def company(self, company_name: str, category: Optional[str] = None) -> Optional[RankedCompany]:
+        scope = category or OVERALL_SCOPE
+        row = self.cache.rank_company(company_name, scope)
+        if row is None:
+            return None
+        return self._ranked(row, self.cache.ranked_count(scope))
+
+    def company_profile(self, company_name: str) -> Dict[str, RankedCompany]:
+        profile: Dict[str, RankedCompany] = {}
+        overall = self.company(company_name)
+        if overall is not None:
+            profile["overall"] = overall
+        for category in self.categories():
+            ranked = self.company(company_name, category)
+            if ranked is not None:
+                profile[category] = ranked
+        return profile
+
+    def leaderboards(self, k: int = 10) -> Dict[str, List[RankedCompany]]:
+        boards = {"overall": self.top_k(k)}
+        for category in self.categories():
+            boards[category] = self.top_k(k, category)
+        return boards
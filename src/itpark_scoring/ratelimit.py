@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from .utils import site_host
+
+
+THROTTLE_STATUSES = (429, 503)
+
+# Requests per second. Hosts start at the old fixed 0.5 s spacing and earn speed.
+INITIAL_RATE = 2.0
+MIN_RATE = 1 / 30
+MAX_RATE = 10.0
+ADDITIVE_INCREASE = 0.5
+THROTTLE_DECREASE = 0.5
+SLOW_DECREASE = 0.8
+# A response this many times slower than the host's running average counts as a sign
+# of load, but only above SLOW_FLOOR seconds so jitter on fast hosts is ignored.
+SLOW_FACTOR = 2.0
+SLOW_FLOOR = 1.0
+LATENCY_SMOOTHING = 0.3
+MAX_RETRY_AFTER = 30.0
+
+
+@dataclass
+class HostState:
+    rate: float = INITIAL_RATE
+    next_allowed: float = 0.0
+    latency: Optional[float] = None
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    bytes: int = 0
+    busy_seconds: float = 0.0
+    waited_seconds: float = 0.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (moment - now).total_seconds())
+
+
+class HostRateController:
+    # Additive increase / multiplicative decrease of each host's request rate: every
+    # clean response adds ADDITIVE_INCREASE req/s, a 429/503 or connection failure
+    # halves it, and a response much slower than usual trims it.
+    def __init__(
+        self,
+        initial_rate: float = INITIAL_RATE,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        max_retry_after: float = MAX_RETRY_AFTER,
+    ):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_retry_after = max_retry_after
+        self._hosts: Dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = HostState(rate=self.initial_rate)
+            self._hosts[host] = state
+        return state
+
+    def knows(self, url: str) -> bool:
+        with self._lock:
+            return site_host(url) in self._hosts
+
+    def seed(self, url: str, rate: float) -> None:
+        with self._lock:
+            self._state(site_host(url)).rate = min(self.max_rate, max(self.min_rate, rate))
+
+    def wait(self, url: str) -> float:
+        # Reserve the host's next slot under the lock, sleep outside it, so concurrent
+        # fetches to one host queue up while other hosts are unaffected.
+        with self._lock:
+            state = self._state(site_host(url))
+            now = time.monotonic()
+            start = max(now, state.next_allowed)
+            state.next_allowed = start + 1.0 / state.rate
+            delay = start - now
+            state.waited_seconds += delay
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def record(
+        self,
+        url: str,
+        status: Optional[int],
+        latency: float,
+        size: int = 0,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            state = self._state(site_host(url))
+            state.requests += 1
+            state.bytes += size
+            state.busy_seconds += latency
+            if status is None or status in THROTTLE_STATUSES:
+                if status is None:
+                    state.errors += 1
+                else:
+                    state.throttled += 1
+                state.rate = max(self.min_rate, state.rate * THROTTLE_DECREASE)
+                if retry_after is not None:
+                    pause = min(retry_after, self.max_retry_after)
+                    state.next_allowed = max(state.next_allowed, time.monotonic() + pause)
+                return
+
+            slow = (
+                state.latency is not None
+                and latency > SLOW_FLOOR
+                and latency > SLOW_FACTOR * state.latency
+            )
+            if slow or status >= 500:
+                state.rate = max(self.min_rate, state.rate * SLOW_DECREASE)
+            else:
+                state.rate = min(self.max_rate, state.rate + ADDITIVE_INCREASE)
+            if state.latency is None:
+                state.latency = latency
+            else:
+                state.latency += LATENCY_SMOOTHING * (latency - state.latency)
+
+    def snapshot(self, url: str) -> HostState:
+        with self._lock:
+            state = self._state(site_host(url))
+            return replace(state)
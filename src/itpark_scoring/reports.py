@@ -4,10 +4,11 @@ import csv
 from pathlib import Path
 from typing import List
 
-from fpdf import FPDF
-from openpyxl import Workbook
+from .models import CompanyResult, CriterionScore
 
-from .models import CompanyResult
+
+def _sources(criterion: CriterionScore) -> str:
+    return " ".join(dict.fromkeys(e.source_url for e in criterion.evidence))
 
 
 class ReportWriter:
@@ -19,7 +20,9 @@ class ReportWriter:
         path = self.output_dir / f"{result.company_name}_scorecard.csv"
         with path.open("w", newline="", encoding="utf-8") as handle:
             writer = csv.writer(handle)
-            writer.writerow(["Criterion", "Category", "Score", "Max", "Weight", "Rationale"])
+            writer.writerow(
+                ["Criterion", "Category", "Score", "Max", "Weight", "Rationale", "Sources"]
+            )
             for criterion in result.scorecard.criteria:
                 writer.writerow([
                     criterion.name,
@@ -28,15 +31,18 @@ class ReportWriter:
                     criterion.max_score,
                     criterion.weight,
                     criterion.rationale,
+                    _sources(criterion),
                 ])
         return path
 
     def write_excel(self, result: CompanyResult) -> Path:
         path = self.output_dir / f"{result.company_name}_scorecard.xlsx"
+        from openpyxl import Workbook
+
         wb = Workbook()
         ws = wb.active
         ws.title = "Scorecard"
-        ws.append(["Criterion", "Category", "Score", "Max", "Weight", "Rationale"])
+        ws.append(["Criterion", "Category", "Score", "Max", "Weight", "Rationale", "Sources"])
         for criterion in result.scorecard.criteria:
             ws.append([
                 criterion.name,
@@ -45,12 +51,15 @@ class ReportWriter:
                 criterion.max_score,
                 criterion.weight,
                 criterion.rationale,
+                _sources(criterion),
             ])
         wb.save(path)
         return path
 
     def write_pdf(self, result: CompanyResult) -> Path:
         path = self.output_dir / f"{result.company_name}_scorecard.pdf"
+        from fpdf import FPDF
+
         pdf = FPDF()
         pdf.set_auto_page_break(auto=True, margin=12)
         pdf.add_page()
@@ -72,6 +81,8 @@ class ReportWriter:
             pdf.multi_cell(0, 6, line)
             pdf.set_text_color(80, 80, 80)
             pdf.multi_cell(0, 6, f"  {criterion.rationale}")
+            if criterion.evidence:
+                pdf.multi_cell(0, 6, f"  Sources: {_sources(criterion)}")
             pdf.set_text_color(0, 0, 0)
         pdf.output(str(path))
         return path
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .llm import DEFAULT_CRITERIA, LLMUsage, criteria_version
+from .parsing import ParsePool
+from .pipeline import score_pages, store_result
+from .storage import CacheStore
+from .utils import TEXT_MEMO_SIZE
+
+
+# Pages loaded and parsed ahead of the LLM threads. Two batches are in flight at once,
+# and both have to fit in the text memo or the parsed text is evicted before use.
+BATCH_PAGES = TEXT_MEMO_SIZE // 2
+
+
+@dataclass
+class RescoreSummary:
+    total: int = 0
+    statuses: Dict[str, int] = field(default_factory=dict)
+    missing_pages: int = 0
+    seconds: float = 0.0
+    run_ids: List[str] = field(default_factory=list)
+    usage: LLMUsage = field(default_factory=LLMUsage)
+
+
+def rescore_runs(
+    cache: CacheStore,
+    api_key: str,
+    model: str,
+    criteria_list: Optional[List[Dict[str, str]]] = None,
+    run_ids: Optional[List[str]] = None,
+    workers: int = 8,
+    progress: Optional[Callable[[str, str], None]] = None,
+    parse_workers: Optional[int] = None,
+) -> RescoreSummary:
+    criteria_list = criteria_list or DEFAULT_CRITERIA
+    version = criteria_version(criteria_list)
+    sources = cache.rescore_sources(run_ids)
+    summary = RescoreSummary(total=len(sources))
+    started = time.monotonic()
+
+    def batches() -> Iterator[List[Tuple[dict, List[Tuple[str, str]]]]]:
+        batch: List[Tuple[dict, List[Tuple[str, str]]]] = []
+        size = 0
+        for source in sources:
+            # Pages come only from cache.db; nothing here touches the network except the LLM.
+            pages = cache.pages_for_run(source["id"])
+            batch.append((source, pages))
+            size += len(pages)
+            if size >= BATCH_PAGES:
+                yield batch
+                batch, size = [], 0
+        if batch:
+            yield batch
+
+    def rescore_one(
+        source, pages: List[Tuple[str, str]]
+    ) -> Tuple[str, Optional[str], Optional[LLMUsage]]:
+        if not pages:
+            return "missing_pages", None, None
+        started_at = datetime.utcnow()
+        usage = LLMUsage()
+        result = score_pages(
+            cache,
+            pages=pages,
+            website=source["website"],
+            api_key=api_key,
+            model=model,
+            criteria_list=criteria_list,
+            usage=usage,
+        )
+        if result.status == "failed":
+            return result.status, None, usage
+        # The run row is only written once there is a result to finish it with.
+        run_id = uuid.uuid4().hex
+        cache.start_run(
+            run_id,
+            source["company_name"],
+            source["website"],
+            model=model,
+            criteria_version=version,
+            source_run_id=source["id"],
+            started_at=started_at,
+        )
+        cache.record_run_pages(run_id, [url for url, _ in pages])
+        store_result(cache, run_id, result)
+        return result.status, run_id, usage
+
+    def drain(futures: Dict[Future, dict]) -> None:
+        # Results are folded into the summary here, on the calling thread only.
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                status, run_id, usage = future.result()
+            except Exception:
+                status, run_id, usage = "failed", None, None
+            if usage is not None:
+                summary.usage.merge(usage)
+            if run_id is not None:
+                summary.run_ids.append(run_id)
+            if status == "missing_pages":
+                summary.missing_pages += 1
+            summary.statuses[status] = summary.statuses.get(status, 0) + 1
+            if progress is not None:
+                progress(source["company_name"], status)
+
+    with ParsePool(parse_workers) as parser, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending: Dict[Future, dict] = {}
+        for batch in batches():
+            # HTML parsing runs in worker processes and seeds the text memo, so the LLM
+            # threads' gate, extraction and prompt steps don't parse under the GIL.
+            parser.parse([page for _, pages in batch for page in pages])
+            submitted = {pool.submit(rescore_one, source, pages): source for source, pages in batch}
+            # The next batch is parsed while this one is being scored.
+            drain(pending)
+            pending = submitted
+        drain(pending)
+
+    summary.seconds = time.monotonic() - started
+    return summary
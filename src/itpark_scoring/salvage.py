@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def _skip(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _decode(text: str, pos: int) -> Tuple[Any, int]:
+    return _decoder.raw_decode(text, _skip(text, pos))
+
+
+def _salvage_list(text: str, pos: int) -> List[Any]:
+    # pos is just past "[". Elements are decoded whole, so a half-written entry at the
+    # cut-off is dropped rather than patched into something that looks complete.
+    items: List[Any] = []
+    while True:
+        pos = _skip(text, pos)
+        if pos >= len(text) or text[pos] == "]":
+            return items
+        try:
+            value, pos = _decode(text, pos)
+        except json.JSONDecodeError:
+            return items
+        items.append(value)
+        pos = _skip(text, pos)
+        if pos < len(text) and text[pos] == ",":
+            pos += 1
+
+
+def _salvage_object(text: str, pos: int) -> Dict[str, Any]:
+    # pos is just past "{". Members are decoded one by one; a list that is cut off keeps
+    # its complete elements, and nothing after the cut is guessed.
+    data: Dict[str, Any] = {}
+    while True:
+        pos = _skip(text, pos)
+        if pos >= len(text) or text[pos] == "}":
+            return data
+        try:
+            key, pos = _decode(text, pos)
+        except json.JSONDecodeError:
+            return data
+        pos = _skip(text, pos)
+        if not isinstance(key, str) or pos >= len(text) or text[pos] != ":":
+            return data
+        pos = _skip(text, pos + 1)
+        try:
+            value, pos = _decode(text, pos)
+        except json.JSONDecodeError:
+            if pos < len(text) and text[pos] == "[":
+                data[key] = _salvage_list(text, pos + 1)
+            return data
+        data[key] = value
+        pos = _skip(text, pos)
+        if pos < len(text) and text[pos] == ",":
+            pos += 1
+
+
+def parse_json_object(raw: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    # Returns (object, complete). Prose and ``` fences around the object are ignored;
+    # a truncated object comes back with every member that was fully written.
+    for start, char in enumerate(raw):
+        if char != "{":
+            continue
+        # A JSON object opens with a quoted key (or is empty); this skips braces in prose.
+        after = _skip(raw, start + 1)
+        if after >= len(raw) or raw[after] not in "\"}":
+            continue
+        try:
+            value, _ = _decoder.raw_decode(raw, start)
+        except json.JSONDecodeError:
+            # Inner objects may still parse on their own, so never fall through to them.
+            return _salvage_object(raw, start + 1), False
+        if isinstance(value, dict):
+            return value, True
+    return None, False
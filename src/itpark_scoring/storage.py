@@ -2,32 +2,85 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from datetime import datetime
+from dataclasses import asdict
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .models import CriterionScore, Feature, Scorecard
+from .urls import canonical_url, clean_url
+from .utils import html_to_text, site_host
+
+if TYPE_CHECKING:
+    from .backends import CacheBackend
+
+
+DEFAULT_CACHE_BUDGET = 256 * 1024 * 1024
+# latest_scores scope holding each company's overall score; other scopes are categories.
+OVERALL_SCOPE = ""
+MAINTENANCE_INTERVAL = timedelta(days=1)
+EVICTION_POLICIES = ("lru", "age")
+# Finished runs per company whose pages are kept from eviction and that scheduled
+# maintenance keeps when it prunes history.
+KEEP_RUNS_PER_COMPANY = 5
+# Unfinished runs older than this were abandoned (no pages, no API key, a crash).
+ABANDONED_RUN_AGE = timedelta(days=1)
+# Bumped when the latest_runs / latest_scores layout or keys change; forces a rebuild.
+RANKINGS_VERSION = "2"
+
+
+def company_key(name: str) -> str:
+    # One company identity for rankings, history pruning and re-scoring, also
+    # registered as the SQL function company_key() so both sides agree on non-ASCII names.
+    return name.strip().lower()
 
 
 class CacheStore:
-    def __init__(self, db_path: Path):
+    def __init__(
+        self,
+        db_path: Path,
+        max_bytes: Optional[int] = DEFAULT_CACHE_BUDGET,
+        max_page_age_days: Optional[int] = None,
+        eviction_policy: str = "lru",
+        maintenance_interval: timedelta = MAINTENANCE_INTERVAL,
+        shared: Optional["CacheBackend"] = None,
+    ):
+        if eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
         self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_page_age_days = max_page_age_days
+        self.eviction_policy = eviction_policy
+        self.maintenance_interval = maintenance_interval
+        # Local cache.db stays the first stop; the shared backend is read on local misses
+        # and written on every save, so one analyst's crawl and tokens serve the team.
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.fts_enabled = False
         self._init_db()
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        # Batch jobs write from several threads and processes; wait for locks, don't fail.
+        conn = sqlite3.connect(self.db_path, timeout=30)
         conn.row_factory = sqlite3.Row
+        conn.create_function("company_key", 1, company_key, deterministic=True)
         return conn
 
     def _init_db(self) -> None:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         with self._connect() as conn:
+            # Only takes effect on a fresh database; maintain() converts older files.
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS pages (
                     url TEXT PRIMARY KEY,
                     content TEXT NOT NULL,
-                    fetched_at TEXT NOT NULL
+                    fetched_at TEXT NOT NULL,
+                    last_accessed TEXT,
+                    size_bytes INTEGER
                 );
 
                 CREATE TABLE IF NOT EXISTS runs (
@@ -60,38 +113,457 @@ class CacheStore:
                     weight REAL NOT NULL,
                     rationale TEXT NOT NULL
                 );
+
+                CREATE TABLE IF NOT EXISTS exports (
+                    name TEXT PRIMARY KEY,
+                    last_finished_at TEXT NOT NULL,
+                    exported_at TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS run_pages (
+                    run_id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    PRIMARY KEY (run_id, url)
+                );
+
+                CREATE TABLE IF NOT EXISTS page_aliases (
+                    alias TEXT PRIMARY KEY,
+                    url TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS latest_runs (
+                    company_key TEXT PRIMARY KEY,
+                    company_name TEXT NOT NULL,
+                    run_id TEXT NOT NULL,
+                    finished_at TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS latest_scores (
+                    company_key TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    PRIMARY KEY (company_key, scope)
+                );
+
+                CREATE TABLE IF NOT EXISTS host_stats (
+                    host TEXT NOT NULL,
+                    recorded_at TEXT NOT NULL,
+                    requests INTEGER NOT NULL,
+                    throttled INTEGER NOT NULL,
+                    errors INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    seconds REAL NOT NULL,
+                    rate REAL NOT NULL,
+                    latency REAL
+                );
+
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_runs_finished_at ON runs (finished_at);
+                CREATE INDEX IF NOT EXISTS idx_runs_company ON runs (company_name, started_at);
+                CREATE INDEX IF NOT EXISTS idx_run_pages_url ON run_pages (url);
+                CREATE INDEX IF NOT EXISTS idx_page_aliases_url ON page_aliases (url);
+                CREATE INDEX IF NOT EXISTS idx_latest_scores_rank ON latest_scores (scope, score);
+                CREATE INDEX IF NOT EXISTS idx_host_stats_host ON host_stats (host, recorded_at);
+                CREATE INDEX IF NOT EXISTS idx_criteria_run_id ON criteria (run_id);
+                CREATE INDEX IF NOT EXISTS idx_features_run_id ON features (run_id);
+                """
+            )
+            self._ensure_column(conn, "pages", "last_accessed", "TEXT")
+            self._ensure_column(conn, "pages", "size_bytes", "INTEGER")
+            # pages.url is the canonical key; fetched_url is the form the site actually serves.
+            self._ensure_column(conn, "pages", "fetched_url", "TEXT")
+            conn.execute(
+                """
+                UPDATE pages
+                SET size_bytes = length(CAST(content AS BLOB)), last_accessed = fetched_at
+                WHERE size_bytes IS NULL
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_pages_last_accessed ON pages (last_accessed)"
+            )
+            self._ensure_column(conn, "criteria", "evidence_json", "TEXT")
+            self._ensure_column(conn, "runs", "model", "TEXT")
+            self._ensure_column(conn, "runs", "criteria_version", "TEXT")
+            self._ensure_column(conn, "runs", "source_run_id", "TEXT")
+            # finished_at is wall-clock time taken before the write, so two writers can
+            # commit out of order; incremental exports follow finish_seq, which is
+            # assigned inside the finishing write instead.
+            self._ensure_column(conn, "runs", "finish_seq", "INTEGER")
+            self._ensure_column(conn, "exports", "last_seq", "INTEGER")
+            unnumbered = conn.execute(
+                "SELECT id FROM runs WHERE finished_at IS NOT NULL AND finish_seq IS NULL "
+                "ORDER BY finished_at, id"
+            ).fetchall()
+            if unnumbered:
+                base = conn.execute("SELECT COALESCE(MAX(finish_seq), 0) FROM runs").fetchone()[0]
+                conn.executemany(
+                    "UPDATE runs SET finish_seq = ? WHERE id = ?",
+                    ((base + n, row["id"]) for n, row in enumerate(unnumbered, 1)),
+                )
+            conn.execute(
+                """
+                UPDATE exports SET last_seq = (
+                    SELECT COALESCE(MAX(finish_seq), 0) FROM runs
+                    WHERE finished_at <= exports.last_finished_at
+                )
+                WHERE last_seq IS NULL
                 """
             )
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_runs_finish_seq ON runs (finish_seq)"
+            )
+            built = conn.execute("SELECT value FROM meta WHERE key = 'rankings_built'").fetchone()
+            if built is None or built["value"] != RANKINGS_VERSION:
+                self._rebuild_rankings(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('rankings_built', ?)",
+                    (RANKINGS_VERSION,),
+                )
+            try:
+                legacy = [row[1] for row in conn.execute("PRAGMA table_info(page_text)")]
+                if "url" in legacy:
+                    # The first index kept url as an unindexed column, so deletes and host
+                    # filters scanned it; maintenance re-indexes pages into the new layout.
+                    conn.execute("DROP TABLE page_text")
+                conn.execute(
+                    """
+                    CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5(
+                        host, body, tokenize = 'porter unicode61'
+                    )
+                    """
+                )
+                # Maps each indexed page to its FTS rowid. An INTEGER PRIMARY KEY survives
+                # VACUUM, which the implicit rowid of pages does not.
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS page_text_ids (
+                        id INTEGER PRIMARY KEY,
+                        url TEXT NOT NULL UNIQUE
+                    )
+                    """
+                )
+                self.fts_enabled = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: evidence search is simply unavailable.
+                self.fts_enabled = False
+
+    @staticmethod
+    def _ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
 
     def get_page(self, url: str) -> Optional[str]:
+        entry = self.get_page_entry(url)
+        return entry[1] if entry else None
+
+    @staticmethod
+    def _lookup_page(conn: sqlite3.Connection, key: str) -> Optional[sqlite3.Row]:
+        return conn.execute(
+            """
+            SELECT url, fetched_url, content FROM pages
+            WHERE url = COALESCE((SELECT url FROM page_aliases WHERE alias = ?), ?)
+            """,
+            (key, key),
+        ).fetchone()
+
+    def peek_page(self, url: str) -> Optional[Tuple[str, str]]:
+        # Local lookup that leaves hit counters and LRU order alone.
+        with self._connect() as conn:
+            row = self._lookup_page(conn, canonical_url(url))
+        return (row["fetched_url"] or row["url"], row["content"]) if row else None
+
+    def get_page_entry(self, url: str) -> Optional[Tuple[str, str]]:
+        key = canonical_url(url)
+        with self._connect() as conn:
+            row = self._lookup_page(conn, key)
+            if row:
+                self.hits += 1
+                conn.execute(
+                    "UPDATE pages SET last_accessed = ? WHERE url = ?",
+                    (datetime.utcnow().isoformat(), row["url"]),
+                )
+                self._bump_meta(conn, "cache_hits")
+                return row["fetched_url"] or row["url"], row["content"]
+        entry = self.shared.get_page(key) if self.shared is not None else None
+        if entry is None:
+            self.misses += 1
+            with self._connect() as conn:
+                self._bump_meta(conn, "cache_misses")
+            return None
+        self.hits += 1
+        self.shared_hits += 1
+        with self._connect() as conn:
+            self._bump_meta(conn, "cache_hits")
+            self._bump_meta(conn, "cache_shared_hits")
+        fetched_url, content = entry
+        self._store_page(canonical_url(fetched_url), fetched_url, content, aliases=(key,))
+        return entry
+
+    def save_page(self, url: str, content: str, aliases: Iterable[str] = ()) -> None:
+        key = canonical_url(url)
+        alias_keys = {canonical_url(item) for item in aliases} - {key}
+        self._store_page(key, clean_url(url), content, alias_keys)
+        if self.shared is not None:
+            self.shared.put_page(key, clean_url(url), content, sorted(alias_keys))
+
+    def _store_page(self, key: str, fetched_url: str, content: str, aliases: Iterable[str]) -> None:
+        now = datetime.utcnow().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO pages (
+                    url, fetched_url, content, fetched_at, last_accessed, size_bytes
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, fetched_url, content, now, now, len(content.encode("utf-8"))),
+            )
+            # Redirect sources and pre-canonical URLs resolve to the stored page next time.
+            conn.executemany(
+                "INSERT OR REPLACE INTO page_aliases (alias, url) VALUES (?, ?)",
+                [(alias, key) for alias in aliases if alias != key],
+            )
+            if self.fts_enabled:
+                # Indexing needs the page text; it happens in index_pages once scoring has
+                # parsed the page anyway, or in maintenance, never on the fetch path.
+                self._unindex_page(conn, key)
+
+    def get_response(self, key: str) -> Optional[str]:
         with self._connect() as conn:
-            row = conn.execute("SELECT content FROM pages WHERE url = ?", (url,)).fetchone()
-            return row["content"] if row else None
+            row = conn.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            return row["response"]
+        response = self.shared.get_response(key) if self.shared is not None else None
+        if response is not None:
+            self.shared_hits += 1
+            with self._connect() as conn:
+                self._bump_meta(conn, "cache_shared_hits")
+            self._store_response(key, "", response)
+        return response
+
+    def save_response(self, key: str, model: str, response: str) -> None:
+        self._store_response(key, model, response)
+        if self.shared is not None:
+            self.shared.put_response(key, model, response)
 
-    def save_page(self, url: str, content: str) -> None:
+    def _store_response(self, key: str, model: str, response: str) -> None:
         with self._connect() as conn:
             conn.execute(
-                "INSERT OR REPLACE INTO pages (url, content, fetched_at) VALUES (?, ?, ?)",
-                (url, content, datetime.utcnow().isoformat()),
+                """
+                INSERT OR REPLACE INTO llm_responses (key, model, response, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, model, response, datetime.utcnow().isoformat()),
+            )
+
+    def canonicalize_pages(self) -> int:
+        # Folds rows cached under raw URLs before keys were canonical into one row per page.
+        merged = 0
+        with self._connect() as conn:
+            rows = conn.execute("SELECT url, fetched_at FROM pages ORDER BY fetched_at DESC").fetchall()
+            kept = {row["url"] for row in rows if canonical_url(row["url"]) == row["url"]}
+            for row in rows:
+                key = canonical_url(row["url"])
+                if key == row["url"]:
+                    continue
+                if key in kept:
+                    conn.execute("DELETE FROM pages WHERE url = ?", (row["url"],))
+                    merged += 1
+                else:
+                    conn.execute(
+                        "UPDATE pages SET url = ?, fetched_url = COALESCE(fetched_url, ?) WHERE url = ?",
+                        (key, clean_url(row["url"]), row["url"]),
+                    )
+                    kept.add(key)
+                conn.execute(
+                    "UPDATE OR IGNORE run_pages SET url = ? WHERE url = ?", (key, row["url"])
+                )
+                conn.execute("DELETE FROM run_pages WHERE url = ?", (row["url"],))
+                if self.fts_enabled:
+                    self._unindex_page(conn, row["url"])
+        return merged
+
+    def _index_page(self, conn: sqlite3.Connection, url: str, content: str) -> None:
+        self._unindex_page(conn, url)
+        text = html_to_text(content)
+        if text:
+            text_id = conn.execute(
+                "INSERT INTO page_text_ids (url) VALUES (?)", (url,)
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO page_text (rowid, host, body) VALUES (?, ?, ?)",
+                (text_id, site_host(url), text),
+            )
+
+    @staticmethod
+    def _unindex_page(conn: sqlite3.Connection, url: str) -> None:
+        row = conn.execute("SELECT id FROM page_text_ids WHERE url = ?", (url,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM page_text WHERE rowid = ?", (row["id"],))
+            conn.execute("DELETE FROM page_text_ids WHERE id = ?", (row["id"],))
+
+    def index_pages(self, pages: Iterable[Tuple[str, str]]) -> int:
+        if not self.fts_enabled:
+            return 0
+        indexed = 0
+        with self._connect() as conn:
+            for url, content in pages:
+                key = canonical_url(url)
+                if conn.execute("SELECT 1 FROM page_text_ids WHERE url = ?", (key,)).fetchone():
+                    continue
+                self._index_page(conn, key, content)
+                indexed += 1
+        return indexed
+
+    def index_missing_pages(self, limit: Optional[int] = None) -> int:
+        if not self.fts_enabled:
+            return 0
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT url, content FROM pages
+                WHERE url NOT IN (SELECT url FROM page_text_ids)
+                LIMIT ?
+                """,
+                (-1 if limit is None else limit,),
+            ).fetchall()
+            for row in rows:
+                self._index_page(conn, row["url"], row["content"])
+        return len(rows)
+
+    def search_pages(
+        self, terms: Iterable[str], host: Optional[str] = None, limit: int = 5
+    ) -> List[sqlite3.Row]:
+        if not self.fts_enabled:
+            return []
+        quoted = ['"' + term.replace('"', '""') + '"' for term in terms if term.strip()]
+        if not quoted:
+            return []
+        match = "body : (" + " OR ".join(quoted) + ")"
+        query = """
+            SELECT COALESCE(p.fetched_url, i.url) AS url, t.host,
+                   snippet(page_text, 1, '', '', '...', 24) AS snippet,
+                   bm25(page_text, 0.0, 1.0) AS rank
+            FROM page_text t
+            JOIN page_text_ids i ON i.id = t.rowid
+            LEFT JOIN pages p ON p.url = i.url
+            WHERE page_text MATCH ?
+        """
+        params: List[Any] = []
+        if host:
+            # The host phrase narrows the search inside the index; the equality check then
+            # drops other hosts that merely contain it (sub.example.com).
+            match = 'host : "' + host.replace('"', '""') + '" AND ' + match
+            query += " AND t.host = ?"
+            params.append(host)
+        params.insert(0, match)
+        query += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def urls_for_host(self, host: str, limit: int = 100) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url FROM pages WHERE url LIKE ? ORDER BY fetched_at DESC",
+                (f"%{host}%",),
+            ).fetchall()
+        return [row["url"] for row in rows if site_host(row["url"]) == host][:limit]
+
+    def record_run_pages(self, run_id: str, urls: Iterable[str]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO run_pages (run_id, url) VALUES (?, ?)",
+                [(run_id, canonical_url(url)) for url in urls],
             )
 
-    def start_run(self, run_id: str, company_name: str, website: Optional[str]) -> None:
+    def start_run(
+        self,
+        run_id: str,
+        company_name: str,
+        website: Optional[str],
+        model: Optional[str] = None,
+        criteria_version: Optional[str] = None,
+        source_run_id: Optional[str] = None,
+        started_at: Optional[datetime] = None,
+    ) -> None:
         with self._connect() as conn:
             conn.execute(
-                "INSERT OR REPLACE INTO runs (id, company_name, website, started_at) VALUES (?, ?, ?, ?)",
-                (run_id, company_name, website, datetime.utcnow().isoformat()),
+                """
+                INSERT OR REPLACE INTO runs (
+                    id, company_name, website, started_at, model, criteria_version, source_run_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    run_id,
+                    company_name,
+                    website,
+                    (started_at or datetime.utcnow()).isoformat(),
+                    model,
+                    criteria_version,
+                    source_run_id,
+                ),
+            )
+
+    def rescore_sources(self, run_ids: Optional[List[str]] = None) -> List[sqlite3.Row]:
+        query = """
+            SELECT id, company_name, website FROM (
+                SELECT r.id, r.company_name, r.website, ROW_NUMBER() OVER (
+                    PARTITION BY company_key(r.company_name) ORDER BY r.started_at DESC
+                ) AS position
+                FROM runs r
+                WHERE EXISTS (SELECT 1 FROM run_pages rp WHERE rp.run_id = r.id)
             )
+            WHERE position = 1
+        """
+        with self._connect() as conn:
+            if run_ids:
+                placeholders = ",".join("?" for _ in run_ids)
+                return conn.execute(
+                    f"SELECT id, company_name, website FROM runs WHERE id IN ({placeholders})",
+                    run_ids,
+                ).fetchall()
+            return conn.execute(query).fetchall()
+
+    def pages_for_run(self, run_id: str) -> List[Tuple[str, str]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT COALESCE(p.fetched_url, p.url) AS url, p.content FROM run_pages rp
+                JOIN pages p ON p.url = rp.url
+                WHERE rp.run_id = ?
+                ORDER BY rp.rowid
+                """,
+                (run_id,),
+            ).fetchall()
+        return [(row["url"], row["content"]) for row in rows]
 
     def finish_run(self, run_id: str, scorecard: Scorecard) -> None:
+        finished_at = datetime.utcnow().isoformat()
         with self._connect() as conn:
             conn.execute(
                 """
                 UPDATE runs
-                SET finished_at = ?, overall_score = ?, coverage = ?, confidence = ?, flags_json = ?
+                SET finished_at = ?, overall_score = ?, coverage = ?, confidence = ?, flags_json = ?,
+                    finish_seq = COALESCE(
+                        finish_seq, (SELECT COALESCE(MAX(finish_seq), 0) + 1 FROM runs)
+                    )
                 WHERE id = ?
                 """,
                 (
-                    datetime.utcnow().isoformat(),
+                    finished_at,
                     scorecard.overall_score,
                     scorecard.coverage,
                     scorecard.confidence,
@@ -99,6 +571,142 @@ class CacheStore:
                     run_id,
                 ),
             )
+            self._update_rankings(conn, run_id, finished_at, scorecard)
+
+    def _update_rankings(
+        self, conn: sqlite3.Connection, run_id: str, finished_at: str, scorecard: Scorecard
+    ) -> None:
+        row = conn.execute("SELECT company_name FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return
+        key = company_key(row["company_name"])
+        cursor = conn.execute(
+            """
+            INSERT INTO latest_runs (company_key, company_name, run_id, finished_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (company_key) DO UPDATE
+            SET company_name = excluded.company_name, run_id = excluded.run_id,
+                finished_at = excluded.finished_at
+            WHERE excluded.finished_at >= latest_runs.finished_at
+            """,
+            (key, row["company_name"], run_id, finished_at),
+        )
+        if cursor.rowcount == 0:
+            return
+        conn.execute("DELETE FROM latest_scores WHERE company_key = ?", (key,))
+        # Gated and disqualified runs have no criteria: the company drops out of the rankings.
+        if scorecard.criteria:
+            scores = [(OVERALL_SCOPE, scorecard.overall_score)]
+            scores += list(scorecard.category_scores.items())
+            conn.executemany(
+                "INSERT INTO latest_scores (company_key, scope, score) VALUES (?, ?, ?)",
+                [(key, scope, score) for scope, score in scores],
+            )
+
+    def _rebuild_rankings(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM latest_runs")
+        conn.execute("DELETE FROM latest_scores")
+        conn.execute(
+            """
+            INSERT INTO latest_runs (company_key, company_name, run_id, finished_at)
+            SELECT company_key, company_name, id, finished_at FROM (
+                SELECT company_key(company_name) AS company_key, company_name, id, finished_at,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY company_key(company_name) ORDER BY finished_at DESC
+                       ) AS position
+                FROM runs
+                WHERE finished_at IS NOT NULL
+            )
+            WHERE position = 1
+            """
+        )
+        # Same formula as aggregate_arrays: 100 * sum(w * clip(s / max)) / sum(w).
+        conn.execute(
+            """
+            INSERT INTO latest_scores (company_key, scope, score)
+            SELECT l.company_key, c.category, ROUND(
+                SUM(MAX(c.weight, 0) * MIN(MAX(
+                    CASE WHEN c.max_score > 0 THEN c.score / c.max_score ELSE 0 END, 0), 1))
+                / SUM(MAX(c.weight, 0)) * 100.0, 2)
+            FROM latest_runs l
+            JOIN criteria c ON c.run_id = l.run_id
+            GROUP BY l.company_key, c.category
+            HAVING SUM(MAX(c.weight, 0)) > 0
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO latest_scores (company_key, scope, score)
+            SELECT l.company_key, ?, r.overall_score
+            FROM latest_runs l
+            JOIN runs r ON r.id = l.run_id
+            WHERE r.overall_score IS NOT NULL
+              AND EXISTS (SELECT 1 FROM criteria c WHERE c.run_id = l.run_id)
+            """,
+            (OVERALL_SCOPE,),
+        )
+
+    def rebuild_rankings(self) -> None:
+        with self._connect() as conn:
+            self._rebuild_rankings(conn)
+
+    def ranking_scopes(self) -> List[str]:
+        with self._connect() as conn:
+            # Skip-scan the (scope, score) index: one seek per scope instead of a full scan.
+            rows = conn.execute(
+                """
+                WITH RECURSIVE scopes (scope) AS (
+                    SELECT MIN(scope) FROM latest_scores
+                    UNION ALL
+                    SELECT (SELECT MIN(scope) FROM latest_scores WHERE scope > scopes.scope)
+                    FROM scopes WHERE scopes.scope IS NOT NULL
+                )
+                SELECT scope FROM scopes WHERE scope IS NOT NULL
+                """
+            ).fetchall()
+        return [row["scope"] for row in rows]
+
+    def ranked_count(self, scope: str = OVERALL_SCOPE) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM latest_scores WHERE scope = ?", (scope,)
+            ).fetchone()[0]
+
+    def rank_top(self, k: int, scope: str = OVERALL_SCOPE) -> List[sqlite3.Row]:
+        # Only the top k rows are read from the (scope, score) index; the window function
+        # ranks that slice, and ties are counted with an index range lookup per row.
+        with self._connect() as conn:
+            return conn.execute(
+                """
+                SELECT l.company_name, l.run_id, t.score,
+                       RANK() OVER (ORDER BY t.score DESC) AS rank,
+                       (SELECT COUNT(*) FROM latest_scores x
+                        WHERE x.scope = ? AND x.score = t.score) AS ties
+                FROM (
+                    SELECT company_key, score FROM latest_scores
+                    WHERE scope = ? ORDER BY score DESC LIMIT ?
+                ) t
+                JOIN latest_runs l ON l.company_key = t.company_key
+                ORDER BY t.score DESC, l.company_name
+                """,
+                (scope, scope, k),
+            ).fetchall()
+
+    def rank_company(self, company_name: str, scope: str = OVERALL_SCOPE) -> Optional[sqlite3.Row]:
+        with self._connect() as conn:
+            return conn.execute(
+                """
+                SELECT l.company_name, l.run_id, t.score,
+                       1 + (SELECT COUNT(*) FROM latest_scores x
+                            WHERE x.scope = t.scope AND x.score > t.score) AS rank,
+                       (SELECT COUNT(*) FROM latest_scores x
+                        WHERE x.scope = t.scope AND x.score = t.score) AS ties
+                FROM latest_runs l
+                JOIN latest_scores t ON t.company_key = l.company_key AND t.scope = ?
+                WHERE l.company_key = ?
+                """,
+                (scope, company_key(company_name)),
+            ).fetchone()
 
     def save_features(self, run_id: str, features: Dict[str, Feature]) -> None:
         with self._connect() as conn:
@@ -113,7 +721,7 @@ class CacheStore:
                         feature.name,
                         json.dumps(feature.value, default=str),
                         feature.confidence,
-                        json.dumps([e.__dict__ for e in feature.evidence], default=str),
+                        json.dumps([asdict(e) for e in feature.evidence], default=str),
                     ),
                 )
 
@@ -123,8 +731,9 @@ class CacheStore:
                 conn.execute(
                     """
                     INSERT INTO criteria (
-                        run_id, criterion_id, name, category, score, max_score, weight, rationale
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        run_id, criterion_id, name, category, score, max_score, weight, rationale,
+                        evidence_json
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (
                         run_id,
@@ -135,5 +744,321 @@ class CacheStore:
                         criterion.max_score,
                         criterion.weight,
                         criterion.rationale,
+                        json.dumps([asdict(e) for e in criterion.evidence], default=str),
                     ),
                 )
+
+    def get_export_mark(self, name: str) -> Optional[int]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT last_seq FROM exports WHERE name = ?", (name,)).fetchone()
+            return row["last_seq"] if row else None
+
+    def set_export_mark(self, name: str, last_seq: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO exports (name, last_seq, last_finished_at, exported_at)
+                VALUES (?, ?, COALESCE((SELECT finished_at FROM runs WHERE finish_seq = ?), ''), ?)
+                """,
+                (name, last_seq, last_seq, datetime.utcnow().isoformat()),
+            )
+
+    def export_window(self, since: Optional[int]) -> Optional[Tuple[Optional[int], int]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MAX(finish_seq) AS upto FROM runs WHERE finish_seq > ?", (since or 0,)
+            ).fetchone()
+        if not row or row["upto"] is None:
+            return None
+        return since, row["upto"]
+
+    def iter_export_rows(
+        self,
+        kind: str,
+        since: Optional[int],
+        upto: int,
+        chunk_size: int = 1000,
+    ) -> Iterator[List[sqlite3.Row]]:
+        if kind == "criteria":
+            columns = (
+                "c.criterion_id, c.name, c.category, c.score, c.max_score, c.weight, c.rationale, "
+                "c.evidence_json"
+            )
+        elif kind == "features":
+            columns = "f.name, f.value_json, f.confidence AS feature_confidence, f.evidence_json"
+        else:
+            raise ValueError(f"Unknown export kind: {kind}")
+        alias = "c" if kind == "criteria" else "f"
+        query = f"""
+            SELECT r.id AS run_id, r.company_name, r.website, r.started_at, r.finished_at,
+                   r.overall_score, r.coverage, r.confidence, r.flags_json, {columns}
+            FROM runs r
+            LEFT JOIN {kind} {alias} ON {alias}.run_id = r.id
+            WHERE r.finish_seq > ? AND r.finish_seq <= ?
+            ORDER BY r.finish_seq
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(query, (since or 0, upto))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def record_host_stats(
+        self,
+        host: str,
+        requests: int,
+        throttled: int,
+        errors: int,
+        size: int,
+        seconds: float,
+        rate: float,
+        latency: Optional[float],
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO host_stats (
+                    host, recorded_at, requests, throttled, errors, bytes, seconds, rate, latency
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    host,
+                    datetime.utcnow().isoformat(),
+                    requests,
+                    throttled,
+                    errors,
+                    size,
+                    seconds,
+                    rate,
+                    latency,
+                ),
+            )
+
+    def host_history(self, host: str, limit: int = 20) -> List[sqlite3.Row]:
+        with self._connect() as conn:
+            return conn.execute(
+                """
+                SELECT *, CASE WHEN seconds > 0 THEN requests / seconds END AS requests_per_second,
+                       CASE WHEN seconds > 0 THEN bytes / seconds END AS bytes_per_second
+                FROM host_stats WHERE host = ? ORDER BY recorded_at DESC LIMIT ?
+                """,
+                (host, limit),
+            ).fetchall()
+
+    def last_host_rate(self, host: str) -> Optional[float]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT rate FROM host_stats WHERE host = ? ORDER BY recorded_at DESC LIMIT 1",
+                (host,),
+            ).fetchone()
+        return row["rate"] if row else None
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def increment_meta(self, key: str, amount: int = 1) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            value = (int(row["value"]) if row else 0) + amount
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+        return value
+
+    @staticmethod
+    def _bump_meta(conn: sqlite3.Connection, key: str, amount: int = 1) -> None:
+        # Counters that `cache stats` reports across sessions, bumped in the caller's transaction.
+        conn.execute(
+            """
+            INSERT INTO meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value
+            """,
+            (key, str(amount)),
+        )
+
+    def prune_runs(self, keep_per_company: int) -> int:
+        # Only finished runs count toward the history kept per company, so abandoned
+        # attempts can never push out a company's last real result.
+        abandoned_before = (datetime.utcnow() - ABANDONED_RUN_AGE).isoformat()
+        with self._connect() as conn:
+            stale = [
+                row["id"]
+                for row in conn.execute(
+                    """
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY company_key(company_name) ORDER BY finished_at DESC
+                        ) AS position
+                        FROM runs
+                        WHERE finished_at IS NOT NULL
+                    )
+                    WHERE position > ?
+                    """,
+                    (keep_per_company,),
+                )
+            ]
+            stale += [
+                row["id"]
+                for row in conn.execute(
+                    "SELECT id FROM runs WHERE finished_at IS NULL AND started_at < ?",
+                    (abandoned_before,),
+                )
+            ]
+            for table, column in (
+                ("criteria", "run_id"),
+                ("features", "run_id"),
+                ("run_pages", "run_id"),
+                ("runs", "id"),
+            ):
+                conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", [(rid,) for rid in stale])
+            orphaned = conn.execute(
+                "SELECT 1 FROM latest_runs WHERE run_id NOT IN (SELECT id FROM runs) LIMIT 1"
+            ).fetchone()
+            if orphaned:
+                self._rebuild_rankings(conn)
+        return len(stale)
+
+    def evict_pages(
+        self,
+        max_bytes: Optional[int] = None,
+        max_age_days: Optional[int] = None,
+        policy: Optional[str] = None,
+        protect_runs: int = KEEP_RUNS_PER_COMPANY,
+    ) -> Tuple[int, int]:
+        policy = policy or self.eviction_policy
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        order_column = "last_accessed" if policy == "lru" else "fetched_at"
+        # Only pages behind each company's latest finished runs are kept regardless of
+        # budget; older and abandoned runs can be re-scored from a fresh crawl.
+        unprotected = f"""
+            FROM pages
+            WHERE url NOT IN (
+                SELECT rp.url FROM run_pages rp JOIN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY company_key(company_name) ORDER BY started_at DESC
+                        ) AS position
+                        FROM runs
+                        WHERE finished_at IS NOT NULL
+                    )
+                    WHERE position <= {int(protect_runs)}
+                ) r ON r.id = rp.run_id
+            )
+        """
+        evicted: List[str] = []
+        freed = 0
+        with self._connect() as conn:
+            if max_age_days is not None:
+                cutoff = (datetime.utcnow() - timedelta(days=max_age_days)).isoformat()
+                for row in conn.execute(
+                    f"SELECT url, size_bytes {unprotected} AND {order_column} < ?", (cutoff,)
+                ):
+                    evicted.append(row["url"])
+                    freed += row["size_bytes"] or 0
+
+            if max_bytes is not None:
+                total = conn.execute(
+                    "SELECT COALESCE(SUM(size_bytes), 0) AS total FROM pages"
+                ).fetchone()["total"]
+                excess = total - freed - max_bytes
+                if excess > 0:
+                    already = set(evicted)
+                    cursor = conn.execute(
+                        f"SELECT url, size_bytes {unprotected} ORDER BY {order_column} ASC"
+                    )
+                    for row in cursor:
+                        if excess <= 0:
+                            break
+                        if row["url"] in already:
+                            continue
+                        size = row["size_bytes"] or 0
+                        evicted.append(row["url"])
+                        freed += size
+                        excess -= size
+
+            conn.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in evicted])
+            conn.executemany("DELETE FROM page_aliases WHERE url = ?", [(url,) for url in evicted])
+            if self.fts_enabled:
+                for url in evicted:
+                    self._unindex_page(conn, url)
+        return len(evicted), freed
+
+    def maintain(self, keep_runs_per_company: Optional[int] = None) -> Dict[str, Any]:
+        pruned = 0
+        if keep_runs_per_company is not None:
+            pruned = self.prune_runs(keep_runs_per_company)
+        merged = self.canonicalize_pages()
+        evicted, freed = self.evict_pages(
+            max_bytes=self.max_bytes, max_age_days=self.max_page_age_days
+        )
+        indexed = self.index_missing_pages()
+
+        conn = self._connect()
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # Switching an existing file to incremental mode needs one full VACUUM.
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            else:
+                conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+
+        self.set_meta("last_maintenance", datetime.utcnow().isoformat())
+        return {
+            "runs_pruned": pruned,
+            "pages_merged": merged,
+            "pages_evicted": evicted,
+            "bytes_freed": freed,
+            "pages_indexed": indexed,
+        }
+
+    def maybe_maintain(
+        self, keep_runs_per_company: Optional[int] = KEEP_RUNS_PER_COMPANY
+    ) -> Optional[Dict[str, Any]]:
+        last = self.get_meta("last_maintenance")
+        if last and datetime.utcnow() - datetime.fromisoformat(last) < self.maintenance_interval:
+            return None
+        return self.maintain(keep_runs_per_company=keep_runs_per_company)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            counts = {
+                table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in (
+                    "pages", "page_aliases", "runs", "criteria", "features", "run_pages",
+                    "llm_responses",
+                )
+            }
+            page_bytes = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM pages").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        hits = int(self.get_meta("cache_hits") or 0)
+        misses = int(self.get_meta("cache_misses") or 0)
+        lookups = hits + misses
+        return {
+            "file_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0,
+            "free_bytes": page_size * free_pages,
+            "page_content_bytes": page_bytes,
+            "budget_bytes": self.max_bytes,
+            "rows": counts,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "shared_backend": type(self.shared).__name__ if self.shared is not None else None,
+            "shared_hits": int(self.get_meta("cache_shared_hits") or 0),
+            "last_maintenance": self.get_meta("last_maintenance"),
+            "llm_calls_saved": int(self.get_meta("llm_calls_saved") or 0),
+            "prompt_chars_saved": int(self.get_meta("prompt_chars_saved") or 0),
+        }
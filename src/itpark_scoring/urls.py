@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, unquote_plus, urlencode, urljoin, urlsplit, urlunsplit
+
+
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "yclid", "dclid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "igshid", "ref_src",
+}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+INDEX_PAGES = ("index.html", "index.htm", "index.php")
+
+CANONICAL_LINK_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+REL_CANONICAL_RE = re.compile(r"\brel=[\"']?canonical\b", re.IGNORECASE)
+HEAD_END_RE = re.compile(r"</head\s*>", re.IGNORECASE)
+HREF_RE = re.compile(r"\bhref=(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))", re.IGNORECASE)
+
+
+def _is_tracking(name: str) -> bool:
+    lowered = name.lower()
+    return lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def clean_url(url: str) -> str:
+    # Safe to fetch: only drops parts the server never sees or does not act on.
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    # Tracking parameters are cut out of the raw query; the rest keeps its exact
+    # encoding (?print stays ?print, %20 stays %20) since that is what gets requested.
+    segments = parts.query.split("&") if parts.query else []
+    kept = [item for item in segments if not _is_tracking(unquote_plus(item.split("=", 1)[0]))]
+    query = "&".join(kept) if len(kept) < len(segments) else parts.query
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def canonical_url(url: str) -> str:
+    # Cache and dedupe key: http/https, www/bare host, trailing slashes, index pages and
+    # query parameter order all collapse to one form. Not necessarily fetchable as is.
+    parts = urlsplit(clean_url(url))
+    host = parts.netloc
+    if host.startswith("www."):
+        host = host[4:]
+    path = re.sub(r"/{2,}", "/", parts.path)
+    head, _, last = path.rpartition("/")
+    if last.lower() in INDEX_PAGES:
+        path = head + "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def same_site(first: str, second: str) -> bool:
+    return urlsplit(canonical_url(first)).netloc == urlsplit(canonical_url(second)).netloc
+
+
+def declared_canonical(html: str, page_url: str) -> Optional[str]:
+    end = HEAD_END_RE.search(html)
+    head = html[: end.start() if end else 20000]
+    for tag in CANONICAL_LINK_RE.findall(head):
+        if not REL_CANONICAL_RE.search(tag):
+            continue
+        match = HREF_RE.search(tag)
+        href = next((group for group in match.groups() if group), "") if match else ""
+        if not href.strip():
+            return None
+        target = urljoin(page_url, href.strip())
+        # Cross-site canonicals (syndicated or misconfigured pages) are ignored.
+        if not target.startswith(("http://", "https://")) or not same_site(target, page_url):
+            return None
+        return clean_url(target)
+    return None
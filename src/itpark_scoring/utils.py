@@ -1,23 +1,61 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable, List
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterable, List, Tuple
+from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+TEXT_MEMO_SIZE = 128
+
+# Extracted text keyed by (length, hash) of the HTML. str caches its hash, so repeat
+# lookups for the same page are O(1) and the memo never holds the HTML itself.
+_text_memo: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+_text_memo_lock = threading.Lock()
 
 
 def normalize_whitespace(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
 
-def html_to_text(html: str) -> str:
-    soup = BeautifulSoup(html, "lxml")
+def remember_text(html: str, text: str) -> None:
+    key = (len(html), hash(html))
+    with _text_memo_lock:
+        _text_memo[key] = text
+        _text_memo.move_to_end(key)
+        while len(_text_memo) > TEXT_MEMO_SIZE:
+            _text_memo.popitem(last=False)
+
+
+def is_remembered(html: str) -> bool:
+    with _text_memo_lock:
+        return (len(html), hash(html)) in _text_memo
+
+
+def soup_to_text(soup: "BeautifulSoup") -> str:
     for tag in soup(["script", "style", "noscript", "svg"]):
         tag.decompose()
     text = soup.get_text(" ")
     return normalize_whitespace(text)
 
 
+def html_to_text(html: str) -> str:
+    key = (len(html), hash(html))
+    with _text_memo_lock:
+        cached = _text_memo.get(key)
+    if cached is not None:
+        return cached
+    from bs4 import BeautifulSoup
+
+    text = soup_to_text(BeautifulSoup(html, "lxml"))
+    remember_text(html, text)
+    return text
+
+
 def unique_list(items: Iterable[str]) -> List[str]:
     seen = set()
     result = []
@@ -28,3 +66,8 @@ def unique_list(items: Iterable[str]) -> List[str]:
         seen.add(key)
         result.append(item.strip())
     return result
+
+
+def site_host(url: str) -> str:
+    host = urlparse(url).netloc.lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else host
@@ -0,0 +1,26 @@
+import pytest
+
+from itpark_scoring.urls import canonical_url, clean_url
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("http://www.Example.com/about/", "https://example.com/about"),
+        ("https://example.com", "https://example.com/"),
+        ("https://example.com/index.html", "https://example.com/"),
+        ("https://example.com/docs/INDEX.PHP", "https://example.com/docs"),
+        ("https://example.com/products-index.html", "https://example.com/products-index.html"),
+        ("https://example.com/docs/appindex.php", "https://example.com/docs/appindex.php"),
+        ("https://example.com//a///b/", "https://example.com/a/b"),
+        ("https://example.com/?b=2&a=1&utm_source=x", "https://example.com/?a=1&b=2"),
+        ("https://example.com:443/x#top", "https://example.com/x"),
+    ],
+)
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_clean_url_keeps_query_encoding():
+    assert clean_url("https://example.com/x?print") == "https://example.com/x?print"
+    assert clean_url("https://example.com/s?q=a%20b&gclid=1") == "https://example.com/s?q=a%20b"